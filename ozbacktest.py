@@ -0,0 +1,193 @@
+import os
+import numpy as np
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dotenv import load_dotenv
+from rich.console import Console
+from rich.table import Table
+from rich.progress import track
+from ozhistory import FrequencyTable, history_sources, iter_history
+from ozlottories import TicketSampler
+from ozsim import DIVISIONS, check_divisions, count_divisions, division_table, spawn_seeds, wilson_interval
+from oztickets import encode_games
+
+# Initialize rich console
+console = Console()
+
+# Strategies to compare: (name, use frequency weights, use the historical odd/even distribution)
+STRATEGIES = {
+    "random": (False, False),
+    "weights": (True, False),
+    "distribution": (False, True),
+    "both": (True, True),
+}
+
+
+# Function to load the history of a lotto with its point-in-time state: running number, powerball and odd/even counts by draw
+def load_backtest_history(lotto_type, picknumber, maxnumber, powerball_max, sources=None):
+    sources, _, extra_count = history_sources(lotto_type, sources)
+    frequency_table = FrequencyTable(maxnumber)
+    powerball_table = FrequencyTable(powerball_max or 1)
+    odd_even_table = FrequencyTable(picknumber)
+    mains, extras = [], []
+
+    # One pass over the history, oldest first; each later draw only adds its own counts
+    for block in iter_history(sources, picknumber, extra_count):
+        frequency_table.update(block["date"], block["main"])
+        odd_even_table.update(block["date"], np.count_nonzero(block["main"] % 2, axis=1)[:, None])
+        if powerball_max:
+            powerball_table.update(block["date"], block["extra"][:, :1])
+        mains.append(block["main"])
+        extras.append(block["extra"])
+
+    return {
+        "main": np.concatenate(mains),
+        "extra": np.concatenate(extras),
+        "dates": frequency_table.dates,
+        "frequency": frequency_table.counts,
+        "powerball_frequency": powerball_table.counts if powerball_max else None,
+        "odd_even": odd_even_table.counts,
+    }
+
+
+# Function to turn a row of running counts into a frequency Counter, dropping numbers never drawn as load_lotto_data does
+def counts_to_frequency(counts):
+    return +Counter(dict(enumerate(counts.tolist())))
+
+
+# Function to build the sampler of a strategy from the state before a draw
+def strategy_sampler(state, position, picknumber, maxnumber, powerball_max, useweights, use_distribution):
+    frequency = counts_to_frequency(state["frequency"][position])
+    powerball_frequency = counts_to_frequency(state["powerball_frequency"][position]) if powerball_max else None
+    odd_even_distribution = None
+    if use_distribution:
+        odd_counts = state["odd_even"][position]
+        odd_even_distribution = {
+            (odds, picknumber - odds): int(odd_counts[odds])
+            for odds in range(2, picknumber - 1)
+            if odd_counts[odds]
+        } or None
+    return TicketSampler(
+        picknumber, maxnumber, bool(powerball_max), powerball_max or 20, frequency, powerball_frequency,
+        useweights=useweights, odd_even_distribution=odd_even_distribution,
+    )
+
+
+# Function to replay a range of draws, generating tickets for every strategy from the earlier draws only
+def backtest_range(state, start, stop, strategies, ticket_count, picknumber, maxnumber, powerball_max, divisions, seed):
+    rng = np.random.default_rng(seed)
+    table = division_table(divisions, picknumber)
+    wins = {name: Counter() for name in strategies}
+    hits = {name: 0 for name in strategies}
+
+    for position in range(start, stop):
+        winning = state["main"][position].tolist()
+        supplementary = [num for num in state["extra"][position].tolist() if num]
+        for name in strategies:
+            useweights, use_distribution = STRATEGIES[name]
+            sampler = strategy_sampler(state, position, picknumber, maxnumber, powerball_max, useweights, use_distribution)
+            masks, powerballs = encode_games(sampler.sample_batch(ticket_count, rng), picknumber)
+            results = count_divisions(check_divisions(masks, powerballs, winning, supplementary, table))
+            wins[name].update(results)
+            hits[name] += bool(results)
+    return wins, hits
+
+
+# Function to split the draws across a process pool and merge the per-strategy results
+def backtest_parallel(state, start, stop, strategies, ticket_count, picknumber, maxnumber, powerball_max, divisions, seeds):
+    workers = len(seeds)
+    bounds = np.linspace(start, stop, workers + 1).round().astype(int).tolist()
+    wins = {name: Counter() for name in strategies}
+    hits = {name: 0 for name in strategies}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(backtest_range, state, first, last, strategies, ticket_count, picknumber, maxnumber, powerball_max, divisions, seed)
+            for first, last, seed in zip(bounds, bounds[1:], seeds)
+        ]
+        for future in track(as_completed(futures), total=workers, description="[green]Backtesting draws..."):
+            worker_wins, worker_hits = future.result()
+            for name in strategies:
+                wins[name].update(worker_wins[name])
+                hits[name] += worker_hits[name]
+    return wins, hits
+
+
+# Function to display the per-strategy division counts and hit rates
+def display_backtest(lotto_type, wins, hits, strategies, draw_count, ticket_count, first_date, last_date, seed):
+    console.rule(f"[bold green]Walk-Forward Backtest ({lotto_type.capitalize()} Draw)[/bold green]")
+    table = Table(title="Winning Tickets by Division")
+    table.add_column("Strategy", justify="left", style="magenta", no_wrap=True)
+    for division, _, _ in DIVISIONS[lotto_type]:
+        table.add_column(str(division), justify="right")
+    for name in strategies:
+        table.add_row(name, *(f"{wins[name][division]:,}" for division, _, _ in DIVISIONS[lotto_type]))
+    console.print(table)
+
+    table = Table(title="Hit Rates")
+    table.add_column("Strategy", justify="left", style="magenta", no_wrap=True)
+    table.add_column("Winning Tickets", justify="right")
+    table.add_column("Ticket Hit Rate", justify="right", style="cyan")
+    table.add_column("95% CI", justify="left")
+    table.add_column("Winning Draws", justify="right", style="cyan")
+    tickets = draw_count * ticket_count
+    for name in strategies:
+        winning_tickets = sum(wins[name].values())
+        low, high = wilson_interval(winning_tickets, tickets)
+        table.add_row(
+            name,
+            f"{winning_tickets:,}",
+            f"{winning_tickets / tickets:.4%}",
+            f"{low:.4%} - {high:.4%}",
+            f"{hits[name]:,} ({hits[name] / draw_count:.2%})",
+        )
+    console.print(table)
+
+    console.print(f"[bold yellow]Draws replayed:[/bold yellow] {draw_count:,} ({first_date} to {last_date})")
+    console.print(f"[bold yellow]Tickets per draw and strategy:[/bold yellow] {ticket_count:,}")
+    console.print(f"[bold yellow]Seed:[/bold yellow] {seed}")
+
+
+def backtest_lotto():
+    load_dotenv()
+    lotto_type = os.getenv("LOTTO", "tuesday").lower()
+    ticket_count = int(os.getenv("SUGGEST", 10))
+    draw_count = int(os.getenv("DRAWS", 100))
+    warmup = int(os.getenv("WARMUP", 20))
+    workers = int(os.getenv("WORKERS", 1))
+    seed = int(os.getenv("SEED") or np.random.SeedSequence().entropy)
+    strategies = [name.strip() for name in os.getenv("STRATEGIES", ",".join(STRATEGIES)).split(",") if name.strip()]
+
+    # Lotto-specific settings
+    if lotto_type == "tuesday":
+        picknumber, maxnumber = 7, 47
+    elif lotto_type == "thursday":
+        picknumber, maxnumber = 7, 35
+    elif lotto_type == "saturday":
+        picknumber, maxnumber = 6, 45
+    else:
+        console.print("[red]Invalid LOTTO type specified.[/red]")
+        return
+    unknown = [name for name in strategies if name not in STRATEGIES]
+    if unknown:
+        console.print(f"[red]Unknown strategies: {', '.join(unknown)}. Choose from {', '.join(STRATEGIES)}.[/red]")
+        return
+
+    powerball_max = 20 if lotto_type == "thursday" else None
+    state = load_backtest_history(lotto_type, picknumber, maxnumber, powerball_max, os.getenv("HISTORY"))
+
+    # Replay the latest draws, keeping at least the warm-up draws before the first one
+    stop = len(state["dates"])
+    start = max(min(warmup, stop), stop - draw_count)
+    if start >= stop:
+        console.print("[red]Not enough history to backtest.[/red]")
+        return
+
+    seeds = spawn_seeds(seed, workers)
+    args = (state, start, stop, strategies, ticket_count, picknumber, maxnumber, powerball_max, DIVISIONS[lotto_type])
+    wins, hits = backtest_parallel(*args, seeds) if workers > 1 else backtest_range(*args, seeds[0])
+    display_backtest(lotto_type, wins, hits, strategies, stop - start, ticket_count, state["dates"][start], state["dates"][stop - 1], seed)
+
+
+# Main block
+if __name__ == "__main__":
+    backtest_lotto()
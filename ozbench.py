@@ -0,0 +1,252 @@
+import os
+import io
+import sys
+import json
+import time
+import random
+import platform
+import tempfile
+import tracemalloc
+from contextlib import redirect_stdout
+from datetime import datetime, timezone
+import numpy as np
+import pandas as pd
+from dotenv import load_dotenv
+from rich.console import Console
+from rich.table import Table
+from ozhistory import LOTTO_GAMES, history_dtype, load_history_file
+from ozlottories import TicketSampler, calculate_historical_distribution, load_lotto_data
+from ozsim import DIVISIONS, check_division, check_divisions, division_table, generate_game_chunks, generate_games
+from ozstats import analyze_draws, collect_stats
+from oztickets import encode_games
+
+# Initialize rich console
+console = Console()
+
+# Main numbers, highest number, supplementary numbers and highest powerball of each game
+GAMES = LOTTO_GAMES
+DRAW_SIZES = (1000, 100000, 1000000)
+TICKET_SIZES = (1000, 100000, 1000000, 10000000)
+
+# Pure-Python reference paths are only timed up to this size, larger runs would take hours
+REFERENCE_LIMIT = 100000
+
+# Timings below this are mostly noise, so they are never flagged as regressions
+MIN_SECONDS = 0.005
+
+
+# Function to generate a synthetic history of uniformly random draws, newest first like the CSVs
+def synthetic_history(game, draw_count, rng):
+    picknumber, maxnumber, extra_count, powerball_max = GAMES[game]
+    history = np.zeros(draw_count, dtype=history_dtype(picknumber, extra_count))
+    history["date"] = np.datetime64("2025-01-07") - 7 * np.arange(draw_count)
+    # Main and supplementary numbers come from one draw without replacement, the powerball from its own barrel
+    for start in range(0, draw_count, 100000):
+        rows = history[start:start + 100000]
+        keys = rng.random((len(rows), maxnumber)).argsort(axis=1)[:, :picknumber + extra_count] + 1
+        rows["main"] = np.sort(keys[:, :picknumber], axis=1)
+        rows["extra"] = rng.integers(1, powerball_max + 1, (len(rows), 1)) if powerball_max else keys[:, picknumber:]
+    return history
+
+
+# Function to write a history in the CSV layout of the draw files
+def write_history_csv(history, filename):
+    picknumber, extra_count = history["main"].shape[1], history["extra"].shape[1]
+    header = ["Date"] + [f"#{i}" for i in range(1, picknumber + 1)] + [f"S{i}" for i in range(1, extra_count + 1)]
+    dates = pd.to_datetime(history["date"]).strftime("%d/%m/%y")
+    with open(filename, "w") as file:
+        file.write(",".join(f'"{cell}"' for cell in header) + "\n")
+        for date, main, extra in zip(dates, history["main"].tolist(), history["extra"].tolist()):
+            file.write(",".join(f'"{cell}"' for cell in [date, *main, *extra]) + "\n")
+
+
+# Function to yield the benchmarks of one game as (name, unit, size, function to time), one size at a time so only its data is held
+def game_benchmarks(game, workdir, max_size, rng):
+    picknumber, maxnumber, extra_count, powerball_max = GAMES[game]
+    winning, supplementary = list(range(1, picknumber + 1)), list(range(picknumber + 1, picknumber + 1 + (1 if powerball_max else extra_count)))
+    divisions = DIVISIONS[game]
+
+    for size in (size for size in DRAW_SIZES if size <= max_size):
+        history = synthetic_history(game, size, rng)
+        csv_file = os.path.join(workdir, f"{game}-{size}.csv")
+        write_history_csv(history, csv_file)
+        draws = history["main"].tolist()
+
+        def parse():
+            # A fresh copy of the CSV has no cache yet, so this times the full parse
+            for suffix in (".npy", ".json"):
+                if os.path.exists(csv_file + suffix):
+                    os.remove(csv_file + suffix)
+            load_history_file(csv_file, picknumber, extra_count)
+
+        yield "history_parse", "draws", size, parse
+        yield "load_lotto_data", "draws", size, lambda: load_lotto_data(game, [csv_file])
+        yield "calculate_historical_distribution", "draws", size, lambda: calculate_historical_distribution(draws, picknumber)
+        yield "collect_stats", "draws", size, lambda: collect_stats(history["main"], picknumber, maxnumber)
+        if size <= REFERENCE_LIMIT:
+            yield "analyze_draws", "draws", size, lambda: analyze_draws(pd.DataFrame(history["main"]))
+
+    for size in (size for size in TICKET_SIZES if size <= max_size):
+        def sample_batch():
+            TicketSampler(picknumber, maxnumber, bool(powerball_max), powerball_max or 20).sample_batch(size, np.random.default_rng(1))
+
+        def game_chunks():
+            for _ in generate_game_chunks(size, picknumber, maxnumber, powerball_max, rng=np.random.default_rng(1)):
+                pass
+
+        # Tickets kept as uint8, so 10M of them fit in memory comfortably
+        tickets = np.concatenate([chunk.astype(np.uint8) for chunk in generate_game_chunks(size, picknumber, maxnumber, powerball_max, rng=rng)])
+        table = division_table(divisions, picknumber)
+
+        def batch_check():
+            for start in range(0, len(tickets), 100000):
+                masks, powerballs = encode_games(tickets[start:start + 100000], picknumber)
+                check_divisions(masks, powerballs, winning, supplementary, table)
+
+        yield "sample_batch", "tickets", size, sample_batch
+        yield "generate_game_chunks", "tickets", size, game_chunks
+        yield "check_divisions", "tickets", size, batch_check
+        if size <= REFERENCE_LIMIT:
+            games = tickets.tolist()
+            yield "generate_games", "tickets", size, lambda: generate_games(size, picknumber, maxnumber, powerball_max)
+            yield "check_division", "tickets", size, lambda: [check_division(game, winning, supplementary, divisions) for game in games]
+
+
+# Function to time one benchmark, best of repeat runs, then run it once more to measure peak traced memory
+def run_benchmark(function, repeat):
+    seconds = []
+    # Progress bars of the benchmarked code are not part of the timing output
+    with redirect_stdout(io.StringIO()):
+        for _ in range(repeat):
+            start = time.perf_counter()
+            function()
+            seconds.append(time.perf_counter() - start)
+        tracemalloc.start()
+        try:
+            function()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return min(seconds), peak
+
+
+# Function to run every benchmark of the chosen games and return the results document
+def run_benchmarks(games, max_size, repeat, seed):
+    rng = np.random.default_rng(seed)
+    random.seed(seed)
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for game in games:
+            for name, unit, size, function in game_benchmarks(game, workdir, max_size, rng):
+                console.print(f"[green]{game} {name} ({size:,} {unit})...[/green]")
+                seconds, peak = run_benchmark(function, repeat)
+                results.append({
+                    "game": game,
+                    "name": name,
+                    "size": size,
+                    "unit": unit,
+                    "seconds": seconds,
+                    "throughput": size / seconds if seconds else None,
+                    "peak_bytes": peak,
+                })
+    return {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "seed": seed,
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+# Function to display a results document
+def display_results(document):
+    table = Table(title=f"Benchmarks ({document['created']})")
+    table.add_column("Game", justify="left", style="magenta")
+    table.add_column("Benchmark", justify="left", style="cyan")
+    table.add_column("Size", justify="right")
+    table.add_column("Seconds", justify="right")
+    table.add_column("Throughput", justify="right", style="green")
+    table.add_column("Peak Memory", justify="right")
+    for result in document["results"]:
+        table.add_row(
+            result["game"],
+            result["name"],
+            f"{result['size']:,} {result['unit']}",
+            f"{result['seconds']:.4f}",
+            f"{result['throughput']:,.0f}/s" if result["throughput"] else "-",
+            f"{result['peak_bytes'] / 2 ** 20:,.1f} MiB",
+        )
+    console.print(table)
+
+
+# Function to compare two results documents, flagging benchmarks that got slower or used more memory than the threshold allows
+def compare_results(baseline, current, threshold):
+    table = Table(title=f"Benchmark Comparison (regression threshold {threshold:.0%})")
+    table.add_column("Game", justify="left", style="magenta")
+    table.add_column("Benchmark", justify="left", style="cyan")
+    table.add_column("Size", justify="right")
+    table.add_column("Time Change", justify="right")
+    table.add_column("Memory Change", justify="right")
+    table.add_column("Status", justify="left")
+
+    baseline_results = {(result["game"], result["name"], result["size"]): result for result in baseline["results"]}
+    regressions = 0
+    for result in current["results"]:
+        before = baseline_results.get((result["game"], result["name"], result["size"]))
+        if before is None:
+            continue
+        time_change = result["seconds"] / before["seconds"] - 1 if before["seconds"] else 0.0
+        memory_change = result["peak_bytes"] / before["peak_bytes"] - 1 if before["peak_bytes"] else 0.0
+        regressed = (time_change > threshold and result["seconds"] >= MIN_SECONDS) or memory_change > threshold
+        regressions += regressed
+        if regressed:
+            status = "[red]regression[/red]"
+        elif time_change < -threshold:
+            status = "[green]faster[/green]"
+        else:
+            status = "ok"
+        table.add_row(result["game"], result["name"], f"{result['size']:,}", f"{time_change:+.1%}", f"{memory_change:+.1%}", status)
+    console.print(table)
+    return regressions
+
+
+def bench_lotto():
+    load_dotenv()
+    args = sys.argv[1:]
+
+    if args and args[0] == "compare":
+        if len(args) != 3:
+            console.print("[red]Usage: python ozbench.py compare baseline.json current.json[/red]")
+            sys.exit(2)
+        with open(args[1]) as file:
+            baseline = json.load(file)
+        with open(args[2]) as file:
+            current = json.load(file)
+        regressions = compare_results(baseline, current, float(os.getenv("THRESHOLD", 0.1)))
+        console.print(f"[bold yellow]Regressions:[/bold yellow] {regressions}")
+        # A non-zero exit status lets scripts fail on regressions
+        sys.exit(1 if regressions else 0)
+
+    games = [game.strip() for game in os.getenv("GAMES", ",".join(GAMES)).split(",") if game.strip()]
+    unknown = [game for game in games if game not in GAMES]
+    if unknown:
+        console.print(f"[red]Unknown games: {', '.join(unknown)}. Choose from {', '.join(GAMES)}.[/red]")
+        sys.exit(2)
+    max_size = int(os.getenv("MAXSIZE", 100000))
+    repeat = int(os.getenv("REPEAT", 3))
+    seed = int(os.getenv("SEED", 42))
+    results_file = args[0] if args else os.getenv("RESULTS", "ozbench.json")
+
+    document = run_benchmarks(games, max_size, repeat, seed)
+    display_results(document)
+    with open(results_file, "w") as file:
+        json.dump(document, file, indent=2)
+    console.print(f"[bold yellow]Results saved to:[/bold yellow] {results_file}")
+
+
+# Main block
+if __name__ == "__main__":
+    bench_lotto()
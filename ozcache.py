@@ -0,0 +1,181 @@
+import os
+import sys
+import json
+import time
+import pickle
+import hashlib
+import tempfile
+from dotenv import load_dotenv
+from ozoutput import console, Table
+from ozprofile import profiler
+from ozhistory import source_hash
+
+# Default location and size limit of the result cache
+CACHE_DIR = ".ozcache"
+CACHE_SIZE = 256 * 2 ** 20
+
+# Part of every key; bump it whenever a cached result changes shape or order, so older entries are never read back
+CACHE_VERSION = 2
+
+
+class ResultCache:
+    """
+    Results of stats and simulations on disk, one pickle per entry named after a hash of what produced it:
+    the kind of result, the game, the content of every history file and the parameters.
+    An edited history file hashes differently, so stale entries are never found again and age out.
+    Hits refresh the entry's modification time, and past max_bytes the least recently used entries are removed.
+    """
+
+    def __init__(self, directory=None, max_bytes=CACHE_SIZE):
+        self.enabled = directory is not None
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    @classmethod
+    def from_env(cls):
+        # CACHE is the cache directory, or false to turn the cache off; CACHE_SIZE is its limit in MiB
+        load_dotenv()
+        setting = os.getenv("CACHE", "")
+        if setting.lower() in ("0", "false", "off"):
+            return cls()
+        max_bytes = int(float(os.getenv("CACHE_SIZE", CACHE_SIZE / 2 ** 20)) * 2 ** 20)
+        return cls(setting if setting.lower() not in ("", "1", "true") else CACHE_DIR, max_bytes)
+
+    def key(self, kind, lotto_type, sources, params):
+        # Parameters are written with sorted keys, so the same settings always give the same key
+        document = {
+            "version": CACHE_VERSION,
+            "kind": kind,
+            "lotto": lotto_type,
+            "history": [source_hash(source) for source in sources],
+            "params": params,
+        }
+        return hashlib.sha256(json.dumps(document, sort_keys=True, default=str).encode()).hexdigest()
+
+    def path(self, kind, key):
+        return os.path.join(self.directory, f"{kind}-{key}.pkl")
+
+    def get(self, kind, key):
+        filename = self.path(kind, key)
+        try:
+            with open(filename, "rb") as file:
+                value = pickle.load(file)
+        except FileNotFoundError:
+            return None
+        except (OSError, pickle.UnpicklingError, EOFError):
+            # A damaged entry is a miss, and is written again
+            return None
+        os.utime(filename)
+        return value
+
+    def put(self, kind, key, value):
+        os.makedirs(self.directory, exist_ok=True)
+        # Written to a temporary file first, so concurrent runs never read half an entry
+        handle, temporary = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(handle, "wb") as file:
+                pickle.dump(value, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary, self.path(kind, key))
+        except BaseException:
+            os.remove(temporary)
+            raise
+        self.evict()
+
+    def cached(self, kind, lotto_type, sources, params, compute):
+        if not self.enabled:
+            return compute()
+        key = self.key(kind, lotto_type, sources, params)
+        value = self.get(kind, key)
+        if value is not None:
+            profiler.count("cache_hits")
+            return value
+        profiler.count("cache_misses")
+        value = compute()
+        self.put(kind, key, value)
+        return value
+
+    def entries(self):
+        # Entries as (kind, key, bytes, last used), least recently used first
+        if not self.directory or not os.path.isdir(self.directory):
+            return []
+        entries = []
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith(".pkl"):
+                continue
+            stat = entry.stat()
+            kind, _, key = entry.name[:-4].rpartition("-")
+            entries.append((kind, key, stat.st_size, stat.st_mtime))
+        return sorted(entries, key=lambda entry: entry[3])
+
+    def evict(self):
+        entries = self.entries()
+        total = sum(entry[2] for entry in entries)
+        removed = 0
+        for kind, key, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(self.path(kind, key))
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        return removed
+
+    def clear(self, kind=None):
+        removed = 0
+        for entry_kind, key, _, _ in self.entries():
+            if kind is None or entry_kind == kind:
+                os.remove(self.path(entry_kind, key))
+                removed += 1
+        return removed
+
+
+# Function to display the cache entries by kind of result
+def display_cache(cache):
+    entries = cache.entries()
+    now = time.time()
+    table = Table(title=f"Result Cache ({cache.directory})")
+    table.add_column("Kind", justify="left", style="magenta")
+    table.add_column("Entries", justify="right")
+    table.add_column("Size", justify="right", style="cyan")
+    table.add_column("Last Used", justify="right", style="green")
+    table.add_column("Least Recently Used", justify="right")
+    kinds = {}
+    for kind, _, size, used in entries:
+        kinds.setdefault(kind, []).append((size, used))
+    for kind, rows in sorted(kinds.items()):
+        table.add_row(
+            kind,
+            f"{len(rows):,}",
+            f"{sum(size for size, _ in rows) / 2 ** 20:,.2f} MiB",
+            f"{now - max(used for _, used in rows):,.0f}s ago",
+            f"{now - min(used for _, used in rows):,.0f}s ago",
+        )
+    console.print(table)
+    total = sum(entry[2] for entry in entries)
+    console.print(f"[bold yellow]Cache size:[/bold yellow] {total / 2 ** 20:,.2f} of {cache.max_bytes / 2 ** 20:,.0f} MiB in {len(entries):,} entries")
+
+
+def cache_lotto():
+    args = sys.argv[1:]
+    if not result_cache.enabled:
+        console.print("[red]The result cache is turned off (CACHE=false).[/red]")
+        sys.exit(2)
+    if not args or args[0] == "info":
+        display_cache(result_cache)
+    elif args[0] == "clear":
+        removed = result_cache.clear(args[1] if len(args) > 1 else None)
+        console.print(f"[bold yellow]Removed:[/bold yellow] {removed:,} entries")
+    else:
+        console.print("[red]Usage: python ozcache.py [info | clear [kind]][/red]")
+        sys.exit(2)
+
+
+# Cache shared by every module of a run
+result_cache = ResultCache.from_env()
+
+
+# Main block
+if __name__ == "__main__":
+    cache_lotto()
@@ -0,0 +1,282 @@
+import os
+import re
+import json
+import hashlib
+from datetime import date, datetime
+import numpy as np
+
+# Main numbers, highest number, supplementary/powerball numbers and highest powerball (None without one) of each lotto
+LOTTO_GAMES = {
+    "tuesday": (7, 47, 3, None),
+    "thursday": (7, 35, 1, 20),
+    "saturday": (6, 45, 2, None),
+}
+
+# History files of each lotto. When files overlap, the draw from the file listed first is kept.
+LOTTO_HISTORY = {
+    "tuesday": ("tuesday.csv", "tuesday-archive.csv"),
+    "thursday": ("thursday.csv",),
+    "saturday": ("saturday.csv",),
+}
+
+
+# Function to build the record type of a history cache: one date, main and extra column per draw
+def history_dtype(picknumber, extra_count):
+    return np.dtype([("date", "datetime64[D]"), ("main", np.uint8, (picknumber,)), ("extra", np.uint8, (extra_count,))])
+
+
+# Function to parse a history CSV into a record array, in file order
+def parse_history(csv_file, picknumber, extra_count):
+    records = []
+    with open(csv_file, mode='r') as file:
+        next(file)
+        for line in file:
+            # Rows are split at dates rather than line ends, so a row missing its line break is still read
+            cells = re.findall(r'"([^"]*)"', line) or line.strip().split(",")
+            row = None
+            for cell in cells:
+                if "/" in cell:
+                    row = [datetime.strptime(cell, "%d/%m/%y").date()]
+                    records.append(row)
+                elif cell and row is not None:
+                    row.append(int(cell))
+
+    history = np.zeros(len(records), dtype=history_dtype(picknumber, extra_count))
+    for i, row in enumerate(records):
+        history["date"][i] = row[0]
+        history["main"][i] = row[1:picknumber + 1]
+        # Older draws may have fewer supplementaries, missing ones are left as 0
+        extras = row[picknumber + 1:picknumber + 1 + extra_count]
+        history["extra"][i, :len(extras)] = extras
+    return history
+
+
+# Function to hash a file's contents
+def file_hash(filename):
+    digest = hashlib.sha256()
+    with open(filename, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# Function to get a history file's SHA-256, read from its cache sidecar while the file is unchanged
+def source_hash(csv_file):
+    stat = os.stat(csv_file)
+    try:
+        with open(f"{csv_file}.json") as file:
+            meta = json.load(file)
+    except (OSError, ValueError):
+        meta = {}
+    if meta.get("sha256") and meta.get("mtime_ns") == stat.st_mtime_ns and meta.get("size") == stat.st_size:
+        return meta["sha256"]
+    return file_hash(csv_file)
+
+
+# Function to write a JSON file atomically
+def write_json(filename, data):
+    temp_file = f"{filename}.{os.getpid()}.tmp"
+    with open(temp_file, "w") as file:
+        json.dump(data, file)
+    os.replace(temp_file, filename)
+
+
+# Function to load a history CSV through its binary cache, rebuilding the cache when the CSV changes
+def load_history_file(csv_file, picknumber, extra_count):
+    cache_file, meta_file = f"{csv_file}.npy", f"{csv_file}.json"
+    stat = os.stat(csv_file)
+    try:
+        with open(meta_file) as file:
+            meta = json.load(file)
+    except (OSError, ValueError):
+        meta = {}
+
+    layout = [picknumber, extra_count]
+    if meta.get("layout") == layout and os.path.exists(cache_file):
+        if meta.get("mtime_ns") == stat.st_mtime_ns and meta.get("size") == stat.st_size:
+            return np.load(cache_file, mmap_mode="r")
+        # Touched but unchanged files only need their timestamp refreshed
+        if meta.get("sha256") == file_hash(csv_file):
+            meta.update(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+            write_json(meta_file, meta)
+            return np.load(cache_file, mmap_mode="r")
+
+    history = parse_history(csv_file, picknumber, extra_count)
+    temp_file = f"{cache_file}.{os.getpid()}.tmp"
+    with open(temp_file, "wb") as file:
+        np.save(file, history)
+    os.replace(temp_file, cache_file)
+    write_json(meta_file, {"layout": layout, "mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha256": file_hash(csv_file)})
+    return np.load(cache_file, mmap_mode="r")
+
+
+# Function to look up the history files and layout of a lotto, optionally with other files
+def history_sources(lotto_type, sources=None):
+    if lotto_type not in LOTTO_HISTORY:
+        raise ValueError("Invalid LOTTO type specified. Choose from 'tuesday', 'thursday', or 'saturday'.")
+    default_sources = LOTTO_HISTORY[lotto_type]
+    picknumber, _, extra_count, _ = LOTTO_GAMES[lotto_type]
+    if isinstance(sources, str):
+        sources = [source.strip() for source in sources.split(",") if source.strip()]
+    sources = tuple(sources or default_sources)
+    # Older archives may be absent, only the first file is required
+    return sources[:1] + tuple(source for source in sources[1:] if os.path.exists(source)), picknumber, extra_count
+
+
+# Function to yield a history's rows in date order, oldest first, as (dates, positions) chunks.
+# The CSVs list draws newest first, so a file sorted either way is walked without sorting it;
+# only a file out of date order has its date column argsorted.
+def dated_chunks(history, chunk_size):
+    dates, count = history["date"], len(history)
+    ascending = descending = True
+    for start in range(0, count, chunk_size):
+        step = np.diff(dates[max(0, start - 1):start + chunk_size].astype(np.int64))
+        ascending = ascending and bool((step >= 0).all())
+        # Equal dates keep file order, so only a strictly descending file can be read backwards
+        descending = descending and bool((step < 0).all())
+    order = None if ascending or descending else np.argsort(dates.astype(np.int64), kind="stable")
+
+    for start in range(0, count, chunk_size):
+        stop = min(count, start + chunk_size)
+        if order is not None:
+            positions = order[start:stop]
+        elif ascending:
+            positions = np.arange(start, stop)
+        else:
+            positions = np.arange(count - 1 - start, count - 1 - stop, -1)
+        yield history["date"][positions].astype(np.int64), positions
+
+
+# Function to merge history files into blocks of draws, oldest first, keeping one draw per date.
+# Each file contributes one chunk at a time; every row up to the earliest chunk end is merged in one stable sort.
+# Files with fewer supplementaries are padded with 0, as in parse_history.
+def iter_history(sources, picknumber, extra_count, block_size=4096):
+    histories = [load_history_file(source, picknumber, extra_count) for source in sources]
+    chunks = [dated_chunks(history, block_size) for history in histories]
+    buffers = [next(chunk, None) for chunk in chunks]
+    last_date = None
+
+    while any(buffer is not None for buffer in buffers):
+        # No file can still hold a row before the earliest of the buffered chunk ends
+        bound = min(buffer[0][-1] for buffer in buffers if buffer is not None)
+        dates, indexes, positions = [], [], []
+        for index, buffer in enumerate(buffers):
+            if buffer is None:
+                continue
+            cut = np.searchsorted(buffer[0], bound, side="right")
+            dates.append(buffer[0][:cut])
+            indexes.append(np.full(cut, index))
+            positions.append(buffer[1][:cut])
+            buffers[index] = (buffer[0][cut:], buffer[1][cut:]) if cut < len(buffer[0]) else next(chunks[index], None)
+
+        # Rows are gathered file by file, so a stable sort puts the file listed first first on equal dates
+        dates = np.concatenate(dates)
+        order = np.argsort(dates, kind="stable")
+        dates, indexes, positions = dates[order], np.concatenate(indexes)[order], np.concatenate(positions)[order]
+        keep = np.ones(len(dates), dtype=bool)
+        keep[1:] = dates[1:] != dates[:-1]
+        if last_date is not None:
+            keep &= dates != last_date
+        if len(dates):
+            last_date = dates[-1]
+        indexes, positions = indexes[keep], positions[keep]
+        for start in range(0, len(indexes), block_size):
+            yield gather_rows(histories, indexes[start:start + block_size], positions[start:start + block_size])
+
+
+# Function to copy the given rows of each file out of the histories into one record array
+def gather_rows(histories, indexes, positions):
+    block = np.empty(len(indexes), dtype=histories[0].dtype)
+    for index, history in enumerate(histories):
+        selected = indexes == index
+        if selected.any():
+            block[selected] = history[positions[selected]]
+    return block
+
+
+# Function to load the draw history of a lotto as a record array with date, main and extra columns.
+# A single file is memory-mapped in file order, several files are merged oldest first.
+def load_history(lotto_type, sources=None):
+    sources, picknumber, extra_count = history_sources(lotto_type, sources)
+    if len(sources) == 1:
+        return load_history_file(sources[0], picknumber, extra_count)
+    blocks = list(iter_history(sources, picknumber, extra_count))
+    return np.concatenate(blocks) if blocks else np.zeros(0, dtype=history_dtype(picknumber, extra_count))
+
+
+# Function to parse a draw date, either ISO (2025-01-11) or as written in the CSVs (11/01/25)
+def parse_date(text):
+    try:
+        return date.fromisoformat(text)
+    except ValueError:
+        pass
+    try:
+        return datetime.strptime(text, "%d/%m/%y").date()
+    except ValueError:
+        raise ValueError(f"Invalid date '{text}'. Use YYYY-MM-DD or DD/MM/YY.") from None
+
+
+# Function to find the draw of a given date, or the latest draw for "latest"
+def find_draw(history, draw_date):
+    if draw_date == "latest":
+        return history[np.argmax(history["date"])]
+    matches = np.flatnonzero(history["date"] == np.datetime64(parse_date(draw_date)))
+    if not len(matches):
+        raise ValueError(f"No draw found on {draw_date}.")
+    return history[matches[0]]
+
+
+class FrequencyTable:
+    """Running number counts by draw, oldest first: counts[i] holds the counts over the first i draws."""
+
+    def __init__(self, maxnumber):
+        self.maxnumber = maxnumber
+        self.date_blocks = [np.zeros(0, dtype="datetime64[D]")]
+        self.count_blocks = [np.zeros((1, maxnumber + 1), dtype=np.int32)]
+
+    def update(self, dates, numbers):
+        numbers = np.asarray(numbers, dtype=np.int64).reshape(len(dates), -1)
+        # One-hot rows of each draw, summed down the block and carried on from the last draw so far
+        hits = np.zeros((len(numbers), self.maxnumber + 1), dtype=np.int32)
+        np.add.at(hits, (np.repeat(np.arange(len(numbers)), numbers.shape[1]), numbers.ravel()), 1)
+        self.date_blocks.append(np.asarray(dates, dtype="datetime64[D]"))
+        self.count_blocks.append(np.cumsum(hits, axis=0, dtype=np.int32) + self.count_blocks[-1][-1])
+
+    @property
+    def dates(self):
+        if len(self.date_blocks) > 1:
+            self.date_blocks = [np.concatenate(self.date_blocks)]
+        return self.date_blocks[0]
+
+    @property
+    def counts(self):
+        if len(self.count_blocks) > 1:
+            self.count_blocks = [np.concatenate(self.count_blocks)]
+        return self.count_blocks[0]
+
+    def __len__(self):
+        return len(self.dates)
+
+    def positions(self, last=None, start=None, end=None):
+        # Draw positions [first, stop) of the last n draws, a date range or both
+        first = np.searchsorted(self.dates, np.datetime64(start, "D"), side="left") if start else 0
+        stop = np.searchsorted(self.dates, np.datetime64(end, "D"), side="right") if end else len(self)
+        if last is not None:
+            first = max(first, stop - last)
+        return int(first), int(stop)
+
+    def window(self, last=None, start=None, end=None):
+        # Counts of every number over the window, indexed by number, without rescanning any draws
+        first, stop = self.positions(last, start, end)
+        return self.counts[stop] - self.counts[first]
+
+
+# Function to parse a window, either a number of draws ("50"), a date range ("2024-01-01:2024-12-31", either end optional) or "all"
+def parse_window(text):
+    text = text.strip()
+    if text in ("", "all"):
+        return {}
+    if ":" in text:
+        start, end = text.split(":", 1)
+        return {"start": parse_date(start) if start else None, "end": parse_date(end) if end else None}
+    return {"last": int(text)}
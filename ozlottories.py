@@ -1,129 +1,126 @@
 import os
-import random
-import csv
+import numpy as np
 from collections import Counter
 from math import comb
 from dotenv import load_dotenv
-from rich.console import Console
-from rich.table import Table
+from ozoutput import console, output_format, write_output, Table
+from ozprofile import profiler
+from ozcache import result_cache
+from ozhistory import LOTTO_GAMES, FrequencyTable, history_sources, iter_history, parse_window
+from oztickets import generate_powerballs, generate_tickets, weight_array, ConstrainedSampler, TicketBook
+
+
+def load_lotto_data(lotto_type, sources=None, window=None):
+    sources, picknumber, extra_count = history_sources(lotto_type, sources)
+    _, maxnumber, _, powerball_max = LOTTO_GAMES[lotto_type]
+    # Tables sized to the lotto's numbers, and no powerball table for lottos without one
+    frequency_table = FrequencyTable(maxnumber)
+    powerball_table = FrequencyTable(powerball_max) if powerball_max else None
+    odd_even_counts = Counter()
 
+    # Stream the merged history files block by block, oldest draw first
+    for block in iter_history(sources, picknumber, extra_count):
+        frequency_table.update(block["date"], block["main"])
+        if powerball_table is not None:
+            powerball_table.update(block["date"], block["extra"][:, :1])
+        count_block_odd_even(odd_even_counts, block["main"], picknumber)
 
-def load_lotto_data(lotto_type):
-    frequency = Counter()
+    # Frequencies over the chosen window only, e.g. the last 50 draws
+    window = parse_window(window) if isinstance(window, str) else window or {}
+    frequency = Counter(dict(enumerate(frequency_table.window(**window).tolist())))
     powerball_frequency = Counter()
-    draws = []
-
-    if lotto_type == "tuesday":
-        csv_file = "tuesday.csv"
-        columns = ["#1", "#2", "#3", "#4", "#5", "#6", "#7"]
-    elif lotto_type == "thursday":
-        csv_file = "thursday.csv"
-        columns = ["#1", "#2", "#3", "#4", "#5", "#6", "#7", "PB"]
-    elif lotto_type == "saturday":
-        csv_file = "saturday.csv"
-        columns = ["#1", "#2", "#3", "#4", "#5", "#6"]
-    else:
-        raise ValueError("Invalid LOTTO type specified. Choose from 'tuesday', 'thursday', or 'saturday'.")
+    if powerball_table is not None:
+        powerball_frequency = Counter(dict(enumerate(powerball_table.window(**window).tolist())))
 
-    with open(csv_file, mode='r') as file:
-        reader = csv.DictReader(file)
-        for row in reader:
-            draw = []
-            for col in columns:
-                if col != "PB":
-                    frequency[int(row[col])] += 1
-                    draw.append(int(row[col]))
-                else:
-                    powerball_frequency[int(row[col])] += 1
+    # Drop the zero counts of numbers that were never drawn
+    return +frequency, +powerball_frequency, odd_even_counts
 
-            draws.append(draw)
 
-    return frequency, powerball_frequency, draws
+# Function to add a block of draws to the odd/even counts, keeping the order in which each split first appeared
+def count_block_odd_even(odd_even_counts, main, picknumber):
+    odds, first, counts = np.unique((main % 2).sum(axis=1), return_index=True, return_counts=True)
+    for index in np.argsort(first, kind="stable"):
+        odd_count = int(odds[index])
+        odd_even_counts[(odd_count, picknumber - odd_count)] += int(counts[index])
+    return odd_even_counts
 
 
-def calculate_historical_distribution(data, picknumber):
-    odd_even_counts = Counter()
-
-    for row in data:
-        odds = sum(1 for num in row if num % 2 != 0)
-        evens = picknumber - odds
+# Function to turn odd/even counts into probabilities, over the splits with at least 2 odd and 2 even numbers
+def odd_even_distribution(odd_even_counts):
+    valid_counts = {k: v for k, v in odd_even_counts.items() if k[0] >= 2 and k[1] >= 2}
+    total_draws = sum(valid_counts.values())
+    return {k: v / total_draws for k, v in valid_counts.items()}
 
-        # Filter out distributions where either odd or even count is less than 2
-        if odds >= 2 and evens >= 2:
-            odd_even_counts[(odds, evens)] += 1
 
+def calculate_historical_distribution(data, picknumber):
     # Calculate probabilities based on historical data
-    total_draws = sum(odd_even_counts.values())
-    probabilities = {k: v / total_draws for k, v in odd_even_counts.items()}
+    return odd_even_distribution(count_odd_even_distribution(data, picknumber))
 
-    return probabilities
 
+class TicketSampler:
+    """Draws tickets from the odd/even distribution and number weights, built once per run."""
 
-def generate_numbers(picknumber, maxnumber, powerball=False, maxnumberp=20, frequency=None, powerball_frequency=None, historical_data=None):
-    suggested_numbers = []
+    def __init__(self, picknumber, maxnumber, powerball=False, maxnumberp=20, frequency=None, powerball_frequency=None, historical_data=None, useweights=False, odd_even_distribution=None,
+                 max_run=None, sum_range=None, exclude=(), require=()):
+        self.powerball = powerball
 
-    for _ in range(SUGGEST):
-        # Calculate historical odd/even distribution for each set of numbers
-        if historical_data:
+        # Odd/even distribution, either given, from historical data or an even split
+        if odd_even_distribution is None and historical_data:
             odd_even_distribution = calculate_historical_distribution(historical_data, picknumber)
-
+        if odd_even_distribution is not None:
             # Ensure that at least 2 odd and 2 even numbers are included
             valid_distributions = {k: v for k, v in odd_even_distribution.items() if k[0] >= 2 and k[1] >= 2}
 
             if not valid_distributions:
                 raise ValueError("No valid odd/even distributions found in historical data.")
-
-            selected_distribution = random.choices(list(valid_distributions.keys()), weights=list(valid_distributions.values()), k=1)[0]
-            odd_count, even_count = selected_distribution
+        elif picknumber % 2 == 0:
+            valid_distributions = {(picknumber // 2, picknumber // 2): 1}
         else:
-            # Fallback to equal distribution if no historical data is provided
-            if picknumber % 2 == 0:
-                odd_count, even_count = picknumber // 2, picknumber // 2
-            else:
-                odd_count, even_count = random.choice([(picknumber // 2 + 1, picknumber // 2), (picknumber // 2, picknumber // 2 + 1)])
-
-            # Ensure at least 2 odd and 2 even numbers
-            if odd_count < 2 or even_count < 2:
-                odd_count, even_count = max(odd_count, 2), max(even_count, 2)
-
-        # Filter odd and even numbers
-        odds = [num for num in range(1, maxnumber + 1) if num % 2 != 0]
-        evens = [num for num in range(1, maxnumber + 1) if num % 2 == 0]
-
-        # Use frequency as weights to select odd and even numbers
-        if USEWEIGHTS:
-            chosen_odds = random.choices(odds, weights=[frequency.get(num, 1) for num in odds], k=odd_count)
-            chosen_evens = random.choices(evens, weights=[frequency.get(num, 1) for num in evens], k=even_count)
-        else:
-            chosen_odds = random.choices(odds, k=odd_count)
-            chosen_evens = random.choices(evens, k=even_count)
-
-        # Ensure no duplicates in the chosen numbers
-        chosen_odds = list(set(chosen_odds))
-        chosen_evens = list(set(chosen_evens))
+            valid_distributions = {(picknumber // 2 + 1, picknumber // 2): 1, (picknumber // 2, picknumber // 2 + 1): 1}
+
+        # Ensure at least 2 odd and 2 even numbers
+        self.distributions = [(max(odd_count, 2), max(even_count, 2)) for odd_count, even_count in valid_distributions]
+        total = sum(valid_distributions.values())
+        self.probabilities = [weight / total for weight in valid_distributions.values()]
+        self.picknumber, self.maxnumber, self.maxnumberp = picknumber, maxnumber, maxnumberp
+
+        # Number weights from the frequencies, or None for uniform picks
+        weights = frequency if useweights and frequency else {}
+        self.weight_array = weight_array(weights, maxnumber) if weights else None
+
+        # Constrained tickets are counted and sampled exactly, rather than generated and filtered
+        self.constrained = None
+        if max_run is not None or sum_range is not None or exclude or require:
+            self.constrained = ConstrainedSampler(picknumber, maxnumber, self.weight_array, max_run, sum_range, exclude, require)
+            feasible = self.constrained.split_weights()[[odd_count for odd_count, _ in self.distributions]] > 0
+            if not feasible.any():
+                raise ValueError("No ticket meets the constraints with the odd/even distribution.")
+            self.probabilities = [probability * ok for probability, ok in zip(self.probabilities, feasible)]
+            self.probabilities = [probability / sum(self.probabilities) for probability in self.probabilities]
 
-        # If duplicates were removed and the list lengths are short, replenish with random choices
-        while len(chosen_odds) < odd_count:
-            new_odd = random.choices(odds, weights=[frequency.get(num, 1) for num in odds], k=1)[0]
-            if new_odd not in chosen_odds:
-                chosen_odds.append(new_odd)
-
-        while len(chosen_evens) < even_count:
-            new_even = random.choices(evens, weights=[frequency.get(num, 1) for num in evens], k=1)[0]
-            if new_even not in chosen_evens:
-                chosen_evens.append(new_even)
-
-        numbers = sorted(chosen_odds + chosen_evens)
-
-        # Add powerball number if required, ensuring no repeat
         if powerball:
-            available_powerballs = set(range(1, maxnumberp + 1)) - set(numbers)
-            powerball_num = random.choices(list(available_powerballs), weights=[powerball_frequency.get(num, 1) for num in available_powerballs], k=1)[0]
-            numbers.append(powerball_num)
+            self.powerball_weight_array = weight_array(powerball_frequency or {}, maxnumberp)
+
+    def sample_batch(self, count, rng=None):
+        # Tickets generated as one (count, picknumber) array, plus a powerball column
+        if self.constrained is not None:
+            rng = rng if rng is not None else np.random.default_rng()
+            split = rng.choice(len(self.distributions), size=count, p=self.probabilities)
+            tickets = self.constrained.sample(count, rng, np.array([odd_count for odd_count, _ in self.distributions])[split])
+        else:
+            tickets = generate_tickets(count, self.picknumber, self.maxnumber, rng, self.distributions, self.probabilities, self.weight_array)
+        if self.powerball:
+            powerballs = generate_powerballs(count, self.maxnumberp, rng, self.powerball_weight_array, tickets)
+            tickets = np.column_stack([tickets, powerballs])
+        return tickets
 
-        suggested_numbers.append(numbers)
 
-    return suggested_numbers
+def generate_numbers(picknumber, maxnumber, powerball=False, maxnumberp=20, frequency=None, powerball_frequency=None, odd_even_counts=None):
+    distribution = odd_even_distribution(odd_even_counts) if odd_even_counts else None
+    sampler = TicketSampler(picknumber, maxnumber, powerball, maxnumberp, frequency, powerball_frequency, None, USEWEIGHTS, distribution, **CONSTRAINTS)
+    tickets = sampler.sample_batch(SUGGEST).tolist()
+    profiler.count("tickets_generated", len(tickets), phase="generate")
+    return tickets
 
 
 def count_odd_even_distribution(data, picknumber):
@@ -262,12 +259,43 @@ def display_suggested_numbers(lotto_numbers, count=3):
     console.print(table_suggested_numbers)
 
 
-def ticket_probability(tickets_played):
-    console.rule("[bold red]Probabilty of winning")
+def save_suggested_numbers(lotto_numbers, filename):
+    if filename.endswith(".oztb"):
+        TicketBook.from_tickets(lotto_numbers, PICKNUMBER, MAXNUMBER).save(filename)
+        return
+
+    with open(filename, mode='w') as file:
+        for numbers in lotto_numbers:
+            file.write(",".join(map(str, numbers)) + "\n")
+
+
+# Function to list the suggested tickets as rows for OUTPUT, powerball apart from the main numbers
+def suggested_records(lotto_numbers, picknumber, powerball=False):
+    records = []
+    for index, numbers in enumerate(lotto_numbers, start=1):
+        main = sorted(numbers[:picknumber])
+        odd_count = sum(num % 2 for num in main)
+        records.append({
+            "ticket": index,
+            "numbers": main,
+            "powerball": numbers[picknumber] if powerball else None,
+            "odd": odd_count,
+            "even": picknumber - odd_count,
+        })
+    return records
+
+
+# Function to get the odds of winning with a number of tickets, as the N of "1 in N"
+def winning_odds(tickets_played):
     total_outcomes = comb(MAXNUMBER, PICKNUMBER)
     if POWERBALL:
         total_outcomes = total_outcomes * comb(MAXNUMBERP, 1)
-    combinations_simplified = round(total_outcomes / tickets_played)
+    return round(total_outcomes / tickets_played)
+
+
+def ticket_probability(tickets_played):
+    console.rule("[bold red]Probabilty of winning")
+    combinations_simplified = winning_odds(tickets_played)
     console.print(f"Chances of winning with [red]{SUGGEST}[/red] tickets is [blue]{SUGGEST}[/blue] in [green]{combinations_simplified:,}[/green]")
 
 
@@ -279,9 +307,17 @@ if __name__ == "__main__":
     LOTTO = os.getenv("LOTTO", "").lower()
     USEWEIGHTS = os.getenv("USEWEIGHTS", "false").lower() == "true"
     SUGGEST = int(os.getenv("SUGGEST", 1))
-
-    # Init rich text console
-    console = Console()
+    SAVE = os.getenv("SAVE")
+    # OUTPUT=json or csv writes the results alone to stdout, with no tables or progress bars
+    OUTPUT = output_format()
+
+    # Ticket constraints, e.g. MAXRUN=2 SUMRANGE=100-200 EXCLUDE=13,31 REQUIRE=7
+    CONSTRAINTS = {
+        "max_run": int(os.getenv("MAXRUN")) if os.getenv("MAXRUN") else None,
+        "sum_range": tuple(int(value) for value in os.getenv("SUMRANGE").split("-")) if os.getenv("SUMRANGE") else None,
+        "exclude": [int(num) for num in os.getenv("EXCLUDE", "").split(",") if num.strip()],
+        "require": [int(num) for num in os.getenv("REQUIRE", "").split(",") if num.strip()],
+    }
 
     if LOTTO == "tuesday":
         PICKNUMBER = 7
@@ -301,28 +337,56 @@ if __name__ == "__main__":
     else:
         raise ValueError("Invalid value for LOTTO. Choose between 'tuesday', 'thursday', or 'saturday'.")
 
-    # Load lottery data based on LOTTO value
-    frequency, powerball_frequency, draws = load_lotto_data(LOTTO)
-
-    # Draw frequency graph
-    draw_frequency_graph(frequency)
+    # Load lottery data based on LOTTO value, from the cache while the history files are unchanged
+    with profiler.phase("load"):
+        sources = history_sources(LOTTO, os.getenv("HISTORY"))[0]
+        frequency, powerball_frequency, odd_even_counts = result_cache.cached(
+            "frequency", LOTTO, sources, {"window": os.getenv("WINDOW")},
+            lambda: load_lotto_data(LOTTO, sources, os.getenv("WINDOW")),
+        )
 
-    if POWERBALL:
-        draw_powerball_frequency_graph(powerball_frequency)
+    if not OUTPUT:
+        with profiler.phase("render"):
+            # Draw frequency graph
+            draw_frequency_graph(frequency)
 
-    # Calculate and display distribution probabilities
-    distribution = probability_distribution(PICKNUMBER)
-    draw_distribution_graph(distribution)
+            if POWERBALL:
+                draw_powerball_frequency_graph(powerball_frequency)
 
-    # Count the odd/even distribution
-    odd_even_counts = count_odd_even_distribution(draws, PICKNUMBER)
+            # Calculate and display distribution probabilities
+            distribution = probability_distribution(PICKNUMBER)
+            draw_distribution_graph(distribution)
 
     # Draw the odd/even distribution graph
-    draw_odd_even_distribution_graph(odd_even_counts, PICKNUMBER)
+    if not OUTPUT:
+        with profiler.phase("render"):
+            draw_odd_even_distribution_graph(odd_even_counts, PICKNUMBER)
 
     # Generate and display lottery numbers
-    lottery_numbers = generate_numbers(PICKNUMBER, MAXNUMBER, POWERBALL, MAXNUMBERP, frequency, powerball_frequency, draws)
-    display_suggested_numbers(lottery_numbers)
+    with profiler.phase("generate"):
+        lottery_numbers = generate_numbers(PICKNUMBER, MAXNUMBER, POWERBALL, MAXNUMBERP, frequency, powerball_frequency, odd_even_counts)
+    if SAVE:
+        with profiler.phase("save"):
+            save_suggested_numbers(lottery_numbers, SAVE)
+    if OUTPUT:
+        with profiler.phase("render"):
+            results = {
+                "lotto": LOTTO,
+                "draws": sum(odd_even_counts.values()),
+                "odds_one_in": winning_odds(SUGGEST),
+                "tickets": suggested_records(lottery_numbers, PICKNUMBER, POWERBALL),
+                "frequency": [{"number": number, "count": frequency[number]} for number in sorted(frequency)],
+                "odd_even": [
+                    {"odd": odds, "even": PICKNUMBER - odds, "drawn": odd_even_counts.get((odds, PICKNUMBER - odds), 0), "probability": comb(PICKNUMBER, odds) / 2 ** PICKNUMBER}
+                    for odds in range(PICKNUMBER + 1)
+                ],
+            }
+            if POWERBALL:
+                results["powerball_frequency"] = [{"number": number, "count": powerball_frequency[number]} for number in sorted(powerball_frequency)]
+            write_output(results, OUTPUT)
+    else:
+        with profiler.phase("render"):
+            display_suggested_numbers(lottery_numbers)
 
-    # Show probability of winning
-    ticket_probability(SUGGEST)
\ No newline at end of file
+            # Show probability of winning
+            ticket_probability(SUGGEST)
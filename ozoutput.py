@@ -0,0 +1,90 @@
+import os
+import sys
+import csv
+import json
+
+
+# Function to get the OUTPUT format: "json" or "csv" for batch jobs, None for the rich tables
+def output_format():
+    setting = os.getenv("OUTPUT", "").lower()
+    if setting in ("", "rich"):
+        return None
+    if setting not in ("json", "csv"):
+        raise ValueError("Invalid OUTPUT format. Choose between 'json' and 'csv'.")
+    return setting
+
+
+class LazyConsole:
+    """
+    Stands in for a rich Console, importing rich on first use only, so headless runs never load it.
+    With OUTPUT set, stdout carries the results alone and anything printed goes to stderr.
+    """
+
+    def __init__(self):
+        self.console = None
+
+    def __getattr__(self, name):
+        if self.console is None:
+            from rich.console import Console
+            self.console = Console(stderr=output_format() is not None)
+        return getattr(self.console, name)
+
+
+# Function to make a rich table, importing rich only when something is rendered
+def Table(*args, **kwargs):
+    from rich.table import Table
+    return Table(*args, **kwargs)
+
+
+# Function to wrap an iterable in a rich progress bar, or leave it bare when OUTPUT is set
+def track(sequence, description="Working...", total=None):
+    if output_format():
+        return sequence
+    from rich.progress import track
+    return track(sequence, description=description, total=total)
+
+
+# Function to turn a value into something json and csv can write
+def plain(value):
+    if isinstance(value, dict):
+        return {str(key): plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [plain(item) for item in value]
+    if hasattr(value, "tolist"):
+        return plain(value.tolist())
+    return value
+
+
+# Function to format one csv cell, numbers within a cell separated by spaces
+def cell(value):
+    if isinstance(value, list):
+        return " ".join(str(cell(item)) for item in value)
+    return "" if value is None else value
+
+
+# Function to write a results document to stdout.
+# Values that are lists of rows become tables; csv writes each table as its own block, first column the table name,
+# after a "summary" block of the remaining values.
+def write_output(results, fmt, file=None):
+    file = file or sys.stdout
+    results = plain(results)
+    if fmt == "json":
+        json.dump(results, file, indent=2)
+        file.write("\n")
+        return
+
+    writer = csv.writer(file, lineterminator="\n")
+    tables = {name: rows for name, rows in results.items() if isinstance(rows, list) and rows and all(isinstance(row, dict) for row in rows)}
+    summary = [(name, value) for name, value in results.items() if name not in tables]
+    blocks = ([("summary", ["key", "value"], [[name, cell(value)] for name, value in summary])] if summary else []) + [
+        (name, list(rows[0]), [[cell(row.get(column)) for column in rows[0]] for row in rows]) for name, rows in tables.items()
+    ]
+    for index, (name, header, rows) in enumerate(blocks):
+        if index:
+            file.write("\n")
+        writer.writerow(["table"] + header)
+        writer.writerows([name] + row for row in rows)
+
+
+# Console shared by the entry points
+console = LazyConsole()
@@ -0,0 +1,96 @@
+import os
+import sys
+import json
+import time
+import atexit
+import cProfile
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from dotenv import load_dotenv
+
+
+class Profiler:
+    """
+    Wall time and peak memory per phase, plus hot-path counters, written as a JSON report at exit.
+    Disabled profilers hand out a shared null context and ignore counts, so instrumented code costs next to nothing.
+    """
+
+    def __init__(self, report_file=None, dump_dir=None, script=None):
+        self.enabled = report_file is not None
+        self.report_file = report_file
+        self.dump_dir = dump_dir
+        self.script = script or os.path.splitext(os.path.basename(sys.argv[0] or "python"))[0]
+        self.phases = {}
+        self.counters = {}
+        self.started = time.perf_counter()
+
+    @classmethod
+    def from_env(cls):
+        # PROFILE=true writes <script>.profile.json, any other value is the report file; PROFILE_DUMP adds a cProfile dump per phase
+        load_dotenv()
+        setting = os.getenv("PROFILE", "")
+        if setting.lower() in ("", "0", "false"):
+            return cls()
+        script = os.path.splitext(os.path.basename(sys.argv[0] or "python"))[0]
+        report_file = f"{script}.profile.json" if setting.lower() in ("1", "true") else setting
+        profiler = cls(report_file, os.getenv("PROFILE_DUMP"), script)
+        tracemalloc.start()
+        atexit.register(profiler.write_report)
+        return profiler
+
+    def phase(self, name):
+        if not self.enabled:
+            return nullcontext()
+        return self.timed_phase(name)
+
+    @contextmanager
+    def timed_phase(self, name):
+        tracemalloc.reset_peak()
+        profile = cProfile.Profile() if self.dump_dir else None
+        if profile:
+            profile.enable()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            if profile:
+                profile.disable()
+                os.makedirs(self.dump_dir, exist_ok=True)
+                profile.dump_stats(os.path.join(self.dump_dir, f"{self.script}-{name}.prof"))
+            # A phase run more than once adds up its time and keeps its highest peak
+            phase = self.phases.setdefault(name, {"seconds": 0.0, "peak_bytes": 0, "calls": 0})
+            phase["seconds"] += seconds
+            phase["peak_bytes"] = max(phase["peak_bytes"], tracemalloc.get_traced_memory()[1])
+            phase["calls"] += 1
+
+    def count(self, name, value=1, phase=None):
+        if not self.enabled:
+            return
+        counter = self.counters.setdefault(name, {"count": 0, "phase": phase})
+        counter["count"] += value
+
+    def report(self):
+        counters = {}
+        for name, counter in self.counters.items():
+            counters[name] = {"count": counter["count"]}
+            # Rates are per second of the phase the events happened in
+            seconds = self.phases.get(counter["phase"], {}).get("seconds")
+            if seconds:
+                counters[name]["phase"] = counter["phase"]
+                counters[name]["per_second"] = counter["count"] / seconds
+        return {
+            "script": self.script,
+            "total_seconds": time.perf_counter() - self.started,
+            "peak_bytes": max((phase["peak_bytes"] for phase in self.phases.values()), default=0),
+            "phases": self.phases,
+            "counters": counters,
+        }
+
+    def write_report(self):
+        with open(self.report_file, "w") as file:
+            json.dump(self.report(), file, indent=2)
+
+
+# Profiler shared by every module of a run
+profiler = Profiler.from_env()
@@ -0,0 +1,370 @@
+import os
+import json
+import time
+import random
+import asyncio
+import numpy as np
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import parse_qsl, urlsplit
+from dotenv import load_dotenv
+from rich.console import Console
+from ozhistory import LOTTO_GAMES, find_draw, history_sources, iter_history, load_history
+from ozlottories import TicketSampler, load_lotto_data, odd_even_distribution, suggested_records
+from ozoutput import plain
+from ozsim import DIVISIONS, division_probabilities, draw_records, generate_numbers, make_book, odds_records, simulate_draws, simulate_games, spawn_seeds, validation_records
+from ozstats import stats_results, update_stats
+
+# Initialize rich console
+console = Console()
+
+# Main numbers, highest number, supplementary numbers and highest powerball of each game
+GAMES = LOTTO_GAMES
+
+# Requests for more tickets than this are sampled in the process pool rather than on the event loop
+INLINE_TICKETS = 10000
+
+# Samplers kept per game, one per distinct set of ticket options
+SAMPLER_CACHE = 64
+
+# Latencies kept per endpoint for the percentiles
+LATENCY_WINDOW = 10000
+
+# Reason phrases of the statuses the server sends
+HTTP_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error"}
+
+
+# Function to get the modification time and size of each history file, None for a missing one
+def history_signature(sources):
+    signature = []
+    for filename in sources:
+        try:
+            stat = os.stat(filename)
+            signature.append((filename, stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            signature.append((filename, None, None))
+    return tuple(signature)
+
+
+# Function to sample tickets as lists, in the event loop or a pool worker
+def sample_tickets(sampler, count, seed):
+    return sampler.sample_batch(count, np.random.default_rng(seed)).tolist()
+
+
+class GameState:
+    """
+    One game's history and everything derived from it, loaded once and kept until a history file changes.
+    Window frequencies, samplers and the statistics are filled in on first use.
+    """
+
+    def __init__(self, lotto_type, sources=None):
+        self.lotto_type = lotto_type
+        self.sources, self.picknumber, self.extra_count = history_sources(lotto_type, sources)
+        _, self.maxnumber, _, self.powerball_max = GAMES[lotto_type]
+        self.signature = history_signature(self.sources)
+        self.history = load_history(lotto_type, self.sources)
+        frequency, powerball_frequency, odd_even_counts = load_lotto_data(lotto_type, self.sources)
+        self.frequencies = {"": (frequency, powerball_frequency)}
+        self.draw_count = sum(odd_even_counts.values())
+        self.distribution = odd_even_distribution(odd_even_counts) if odd_even_counts else None
+        self.samplers = OrderedDict()
+        self.stats = None
+        self.loaded = time.time()
+
+    def changed(self):
+        return history_signature(self.sources) != self.signature
+
+    def window_frequencies(self, window):
+        if window not in self.frequencies:
+            frequency, powerball_frequency, _ = load_lotto_data(self.lotto_type, self.sources, window)
+            self.frequencies[window] = (frequency, powerball_frequency)
+        return self.frequencies[window]
+
+    def sampler(self, window, useweights, use_distribution, constraints):
+        key = (window, useweights, use_distribution, *(tuple(value) if isinstance(value, list) else value for value in constraints.values()))
+        if key in self.samplers:
+            self.samplers.move_to_end(key)
+            return self.samplers[key]
+        frequency, powerball_frequency = self.window_frequencies(window)
+        sampler = TicketSampler(
+            self.picknumber, self.maxnumber, bool(self.powerball_max), self.powerball_max or 20, frequency, powerball_frequency,
+            useweights=useweights, odd_even_distribution=self.distribution if use_distribution else None, **constraints,
+        )
+        self.samplers[key] = sampler
+        if len(self.samplers) > SAMPLER_CACHE:
+            self.samplers.popitem(last=False)
+        return sampler
+
+    def summary(self):
+        if self.stats is None:
+            stats = update_stats(lambda: iter_history(self.sources, self.picknumber, self.extra_count), self.picknumber, self.maxnumber, self.sources)
+            self.stats = stats, stats_results(stats, 100)
+        return self.stats
+
+
+# Function to read an integer query parameter
+def query_int(query, name, default=None):
+    value = query.get(name)
+    if value in (None, ""):
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"{name} must be a whole number.")
+
+
+# Function to read the seed of a request, picking a random one when none is given; seed=0 is a seed like any other
+def query_seed(query):
+    seed = query_int(query, "seed")
+    return np.random.SeedSequence().entropy if seed is None else seed
+
+
+# Function to read a comma-separated list of numbers from the query
+def query_numbers(query, name):
+    return [int(num) for num in query.get(name, "").split(",") if num.strip()]
+
+
+# Function to read a true/false query parameter
+def query_bool(query, name, default=False):
+    value = query.get(name)
+    return default if value is None else value.lower() in ("1", "true", "yes")
+
+
+# Function to get the p50 and p99 latencies and request counts of each endpoint, in milliseconds
+def latency_metrics(latencies, requests, errors):
+    metrics = {}
+    for endpoint, samples in latencies.items():
+        milliseconds = np.array(samples) * 1000
+        metrics[endpoint] = {
+            "requests": requests[endpoint],
+            "errors": errors[endpoint],
+            "p50_ms": float(np.percentile(milliseconds, 50)),
+            "p99_ms": float(np.percentile(milliseconds, 99)),
+            "max_ms": float(milliseconds.max()),
+        }
+    return metrics
+
+
+class LottoServer:
+    """
+    Local HTTP service answering suggestion, simulation and statistics requests from warm per-game state.
+    Simulations run in a process pool, so the event loop keeps answering while they do.
+    """
+
+    def __init__(self, workers):
+        self.workers = workers
+        self.pool = ProcessPoolExecutor(max_workers=workers)
+        self.games = {}
+        self.locks = {lotto_type: asyncio.Lock() for lotto_type in GAMES}
+        self.latencies = {}
+        self.requests, self.errors, self.reloads = Counter(), Counter(), Counter()
+        self.started = time.time()
+        self.endpoints = {"/suggest": self.suggest, "/simulate": self.simulate, "/stats": self.stats, "/metrics": self.metrics}
+
+    async def game(self, query):
+        lotto_type = query.get("lotto", "tuesday").lower()
+        if lotto_type not in GAMES:
+            raise ValueError("Invalid lotto. Choose between 'tuesday', 'thursday', or 'saturday'.")
+        # Loading takes a lock, so concurrent requests for a cold or changed game load it once
+        async with self.locks[lotto_type]:
+            state = self.games.get(lotto_type)
+            if state is None or state.changed():
+                self.reloads[lotto_type] += state is not None
+                state = self.games[lotto_type] = await asyncio.to_thread(GameState, lotto_type)
+        return state
+
+    async def suggest(self, query):
+        game = await self.game(query)
+        count = query_int(query, "count", 1)
+        if count < 1:
+            raise ValueError("count must be at least 1.")
+        sum_range = query.get("sumrange")
+        constraints = {
+            "max_run": query_int(query, "maxrun"),
+            "sum_range": tuple(int(value) for value in sum_range.split("-")) if sum_range else None,
+            "exclude": query_numbers(query, "exclude"),
+            "require": query_numbers(query, "require"),
+        }
+        sampler = game.sampler(query.get("window", ""), query_bool(query, "weights"), query_bool(query, "distribution", True), constraints)
+        seed = query_seed(query)
+        if count > INLINE_TICKETS:
+            tickets = await asyncio.get_running_loop().run_in_executor(self.pool, sample_tickets, sampler, count, seed)
+        else:
+            tickets = sample_tickets(sampler, count, seed)
+        return {"lotto": game.lotto_type, "seed": seed, "tickets": suggested_records(tickets, game.picknumber, bool(game.powerball_max))}
+
+    async def simulate(self, query):
+        game = await self.game(query)
+        lotto_type, picknumber, maxnumber, powerball_max = game.lotto_type, game.picknumber, game.maxnumber, game.powerball_max
+        mode = query.get("mode", "simulate").lower()
+        seed = query_seed(query)
+        chunk_size = query_int(query, "chunk", 100000)
+        divisions = DIVISIONS[lotto_type]
+        probabilities = division_probabilities(divisions, picknumber, maxnumber, game.extra_count, powerball_max)
+        loop = asyncio.get_running_loop()
+
+        if mode == "odds":
+            ticket_count = query_int(query, "book", 1)
+            return {"lotto": lotto_type, "mode": mode, "tickets": ticket_count, "divisions": odds_records(lotto_type, probabilities, ticket_count)}
+
+        draw_seed, worker_seed = spawn_seeds(seed, 2)
+        if mode == "draws":
+            draw_count = query_int(query, "draws", 1000)
+            book = make_book(None, query_int(query, "book", 10), picknumber, maxnumber, powerball_max, np.random.default_rng(draw_seed))
+            wins, hits = await loop.run_in_executor(
+                self.pool, simulate_draws, book, draw_count, picknumber, maxnumber, game.extra_count, powerball_max, divisions, chunk_size, worker_seed,
+            )
+            return {"lotto": lotto_type, "mode": mode, "tickets": len(book), "draws": draw_count, "seed": seed, "divisions": draw_records(lotto_type, wins, hits, draw_count)}
+        if mode not in ("simulate", "validate"):
+            raise ValueError("Invalid mode. Choose between 'simulate', 'validate', 'draws', or 'odds'.")
+
+        # Winning numbers from a past draw, the query or drawn at random, as ozsim does
+        if query.get("drawdate"):
+            draw = find_draw(game.history, query["drawdate"])
+            winning, supplementary = draw["main"].tolist(), [num for num in draw["extra"].tolist() if num]
+        elif query.get("winning"):
+            numbers = query_numbers(query, "winning")
+            winning, supplementary = numbers[:picknumber], numbers[picknumber:picknumber + game.extra_count]
+            if len(winning) != picknumber or len(supplementary) != game.extra_count:
+                raise ValueError("Invalid winning and/or supplementary length.")
+        else:
+            draw_rng = random.Random(draw_seed)
+            winning = generate_numbers(picknumber, maxnumber, draw_rng)
+            supplementary = generate_numbers(game.extra_count, powerball_max or maxnumber, draw_rng)
+            while not powerball_max and set(supplementary).intersection(winning):
+                supplementary = generate_numbers(game.extra_count, maxnumber, draw_rng)
+
+        game_count = query_int(query, "games", 100000)
+        results = await loop.run_in_executor(
+            self.pool, simulate_games, game_count, picknumber, maxnumber, powerball_max, winning, supplementary, divisions, chunk_size, worker_seed,
+        )
+        if mode == "validate":
+            return {"lotto": lotto_type, "mode": mode, "tickets": game_count, "divisions": validation_records(lotto_type, results, game_count, probabilities)}
+        return {
+            "lotto": lotto_type,
+            "mode": mode,
+            "games": game_count,
+            "winning": winning,
+            "supplementary": supplementary,
+            "seed": seed,
+            "winning_games": sum(results.values()),
+            "divisions": [{"division": division, "winning_games": results.get(division, 0)} for division, _, _ in divisions],
+        }
+
+    async def stats(self, query):
+        game = await self.game(query)
+        top = query_int(query, "top", 5)
+        _, results = await asyncio.to_thread(game.summary)
+        # The most common combinations are kept to 100, enough for any top asked for
+        results = {name: value[:top] if name in ("all_pairs", "all_triplets", "consecutive_pairs", "consecutive_triplets") else value for name, value in results.items()}
+        return {"lotto": game.lotto_type, **results}
+
+    async def metrics(self, query):
+        return {
+            "uptime_seconds": time.time() - self.started,
+            "workers": self.workers,
+            "games": {
+                lotto_type: {"draws": state.draw_count, "loaded": state.loaded, "reloads": self.reloads[lotto_type], "samplers": len(state.samplers)}
+                for lotto_type, state in self.games.items()
+            },
+            "endpoints": latency_metrics(self.latencies, self.requests, self.errors),
+        }
+
+    async def respond(self, method, target):
+        url = urlsplit(target)
+        handler = self.endpoints.get(url.path)
+        if handler is None:
+            return 404, {"error": f"Unknown endpoint {url.path}. Choose from {', '.join(self.endpoints)}."}
+        if method != "GET":
+            return 405, {"error": "Only GET is supported."}
+        try:
+            return 200, await handler(dict(parse_qsl(url.query)))
+        except ValueError as error:
+            return 400, {"error": str(error)}
+        except Exception as error:
+            console.print_exception()
+            return 500, {"error": f"{type(error).__name__}: {error}"}
+
+    async def handle(self, reader, writer):
+        # HTTP/1.1 with keep-alive, enough for curl and client libraries on localhost
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if not line.strip():
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                try:
+                    length = int(headers.get("content-length") or 0)
+                except ValueError:
+                    length = -1
+                if length > 0:
+                    await reader.readexactly(length)
+
+                start = time.perf_counter()
+                method, target, version = (request_line.decode("latin-1").split() + ["", "", ""])[:3]
+                if length < 0:
+                    # Without a valid length the body cannot be skipped, so the connection is closed after the error
+                    status, body = 400, {"error": f"Invalid Content-Length {headers['content-length']!r}."}
+                else:
+                    status, body = await self.respond(method, target)
+                keep_alive = length >= 0 and version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                payload = json.dumps(plain(body)).encode()
+                writer.write(
+                    f"HTTP/1.1 {status} {HTTP_REASONS[status]}\r\nContent-Type: application/json\r\nContent-Length: {len(payload)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + payload
+                )
+                await writer.drain()
+
+                endpoint = urlsplit(target).path if status != 404 else "unknown"
+                self.latencies.setdefault(endpoint, deque(maxlen=LATENCY_WINDOW)).append(time.perf_counter() - start)
+                self.requests[endpoint] += 1
+                self.errors[endpoint] += status >= 400
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    def close(self):
+        self.pool.shutdown(cancel_futures=True)
+
+
+async def serve_lotto():
+    load_dotenv()
+    host = os.getenv("HOST", "127.0.0.1")
+    port = int(os.getenv("PORT", 8765))
+    socket_path = os.getenv("SOCKET")
+    workers = int(os.getenv("WORKERS", os.cpu_count() or 1))
+    preload = [lotto_type.strip() for lotto_type in os.getenv("PRELOAD", "").split(",") if lotto_type.strip()]
+
+    server = LottoServer(workers)
+    try:
+        for lotto_type in preload:
+            await server.game({"lotto": lotto_type})
+        if socket_path:
+            listener = await asyncio.start_unix_server(server.handle, path=socket_path)
+            console.print(f"[bold yellow]Serving on[/bold yellow] unix:{socket_path} ({workers} worker{'s' if workers > 1 else ''})")
+        else:
+            listener = await asyncio.start_server(server.handle, host, port)
+            console.print(f"[bold yellow]Serving on[/bold yellow] http://{host}:{port} ({workers} worker{'s' if workers > 1 else ''})")
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        server.close()
+        if socket_path and os.path.exists(socket_path):
+            os.remove(socket_path)
+
+
+# Main block
+if __name__ == "__main__":
+    try:
+        asyncio.run(serve_lotto())
+    except KeyboardInterrupt:
+        pass
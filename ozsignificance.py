@@ -0,0 +1,232 @@
+import os
+import numpy as np
+from math import comb, exp, lgamma, log
+from itertools import combinations
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dotenv import load_dotenv
+from rich.console import Console
+from rich.table import Table
+from rich.progress import track
+from ozcache import result_cache
+from ozhistory import history_sources, iter_history
+from ozsim import spawn_seeds
+from ozstats import collect_stats
+from oztickets import binomial_table
+
+# Initialize rich console
+console = Console()
+
+
+# Function to get the regularized upper incomplete gamma function Q(a, x), by series or continued fraction
+def upper_gamma(a, x):
+    if x <= 0:
+        return 1.0
+    if x < a + 1:
+        term = total = 1.0 / a
+        for n in range(1, 1000):
+            term *= x / (a + n)
+            total += term
+            if abs(term) < abs(total) * 1e-15:
+                break
+        return 1.0 - total * exp(-x + a * log(x) - lgamma(a))
+    # Lentz's continued fraction
+    b, c, d = x + 1 - a, 1e300, 1 / (x + 1 - a)
+    h = d
+    for n in range(1, 1000):
+        an = -n * (n - a)
+        b += 2
+        d = an * d + b
+        d = 1e-300 if abs(d) < 1e-300 else d
+        c = b + an / c
+        c = 1e-300 if abs(c) < 1e-300 else c
+        d = 1 / d
+        h *= d * c
+        if abs(d * c - 1) < 1e-15:
+            break
+    return exp(-x + a * log(x) - lgamma(a)) * h
+
+
+# Function to get the chi-square p-value of a statistic
+def chi_square_pvalue(statistic, df):
+    return upper_gamma(df / 2, statistic / 2)
+
+
+# Function to get the chi-square p-value of number frequencies from draws of picknumber balls without replacement.
+# Numbers within a draw are negatively correlated, which shrinks the statistic by (maxnumber - picknumber) / (maxnumber - 1).
+def frequency_pvalue(statistic, picknumber, maxnumber):
+    return chi_square_pvalue(statistic * (maxnumber - 1) / (maxnumber - picknumber), maxnumber - 1)
+
+
+# Function to get the chi-square statistic of number frequencies against an even spread, one row per history
+def chi_square(frequency):
+    frequency = np.asarray(frequency, dtype=np.float64)
+    expected = frequency.sum(axis=-1, keepdims=True) / frequency.shape[-1]
+    return ((frequency - expected) ** 2 / expected).sum(axis=-1)
+
+
+# Function to get the chance that one given combination of size numbers is drawn at least count times in draw_count draws
+def binomial_tail(count, draw_count, size, picknumber, maxnumber):
+    rate = comb(maxnumber - size, picknumber - size) / comb(maxnumber, picknumber)
+    terms = [
+        lgamma(draw_count + 1) - lgamma(k + 1) - lgamma(draw_count - k + 1) + k * log(rate) + (draw_count - k) * log(1 - rate)
+        for k in range(count, draw_count + 1)
+    ]
+    return min(1.0, sum(exp(term) for term in terms))
+
+
+# Function to draw sorted random draws as (picknumber, rows) uint8 positions, with Floyd's algorithm and a sorting network
+def sample_sorted_draws(rng, rows, picknumber, maxnumber):
+    highs = np.arange(maxnumber - picknumber, maxnumber, dtype=np.uint8)
+    candidates = rng.integers(0, highs[:, None] + 1, size=(picknumber, rows), dtype=np.uint8)
+    draws = np.empty((picknumber, rows), dtype=np.uint8)
+    for i in range(picknumber):
+        repeated = np.zeros(rows, dtype=bool)
+        for k in range(i):
+            repeated |= draws[k] == candidates[i]
+        draws[i] = np.where(repeated, highs[i], candidates[i])
+    # Odd-even transposition sort, row against row
+    for step in range(picknumber):
+        for i in range(step % 2, picknumber - 1, 2):
+            low = np.minimum(draws[i], draws[i + 1])
+            np.maximum(draws[i], draws[i + 1], out=draws[i + 1])
+            draws[i] = low
+    return draws
+
+
+# Function to simulate random histories, keeping the chi-square statistic and the highest pair and triplet count of each
+def simulate_histories(history_count, draw_count, picknumber, maxnumber, seed, batch=4):
+    rng = np.random.default_rng(seed)
+    binomials = np.ascontiguousarray(binomial_table(maxnumber, 3).T)
+    statistics = {"chi_square": np.zeros(history_count), "pair": np.zeros(history_count, dtype=np.int64), "triplet": np.zeros(history_count, dtype=np.int64)}
+
+    for start in range(0, history_count, batch):
+        rows = min(batch, history_count - start)
+        # One row per sorted position, so every operation below runs over contiguous memory
+        draws = sample_sorted_draws(rng, rows * draw_count, picknumber, maxnumber)
+        history = np.repeat(np.arange(rows), draw_count)
+        # Offsets keep every history's counts in its own block of one bincount
+        frequency = np.bincount((draws + history * maxnumber).ravel(), minlength=rows * maxnumber).reshape(rows, maxnumber)
+        statistics["chi_square"][start:start + rows] = chi_square(frequency)
+
+        # C(number, k) of every position, summed below into the colex rank of each pair and triplet
+        terms = binomials[:, draws]
+        for name, size in (("pair", 2), ("triplet", 3)):
+            subset_count = comb(maxnumber, size)
+            subsets = list(combinations(range(picknumber), size))
+            ranks = np.empty((len(subsets), rows * draw_count), dtype=np.int64)
+            for row, positions in enumerate(subsets):
+                np.multiply(history, subset_count, out=ranks[row])
+                for digit, position in enumerate(positions):
+                    ranks[row] += terms[digit + 1, position]
+            counts = np.bincount(ranks.ravel(), minlength=rows * subset_count)
+            statistics[name][start:start + rows] = counts.reshape(rows, subset_count).max(axis=1)
+    return statistics
+
+
+# Function to split the simulated histories across a process pool and join their statistics
+def simulate_parallel(history_count, draw_count, picknumber, maxnumber, seeds):
+    workers = len(seeds)
+    shares = [history_count // workers + (1 if i < history_count % workers else 0) for i in range(workers)]
+    parts = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(simulate_histories, share, draw_count, picknumber, maxnumber, seed) for share, seed in zip(shares, seeds)]
+        for future in track(as_completed(futures), total=workers, description="[green]Simulating histories..."):
+            parts.append(future.result())
+    return {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
+
+
+# Function to get a Monte Carlo p-value: the share of simulated histories at least as extreme, counting the observed one
+def monte_carlo_pvalue(simulated, observed):
+    return (1 + np.count_nonzero(simulated >= observed)) / (1 + len(simulated))
+
+
+# Function to display the frequency test and the significance of the most common pairs and triplets
+def display_significance(lotto_type, stats, simulated, picknumber, maxnumber, top):
+    draw_count = stats["draw_count"]
+    history_count = len(simulated["chi_square"])
+    console.rule(f"[bold green]Significance Tests ({lotto_type.capitalize()} Draw)[/bold green]")
+
+    frequency = [stats["number_frequency"][num] for num in range(1, maxnumber + 1)]
+    statistic = float(chi_square(frequency))
+    table = Table(title="Number Frequency Uniformity (Chi-Square)")
+    table.add_column("Statistic", justify="right")
+    table.add_column("Degrees of Freedom", justify="right")
+    table.add_column("p-value (Chi-Square)", justify="right", style="cyan")
+    table.add_column("p-value (Simulated)", justify="right", style="cyan")
+    table.add_row(
+        f"{statistic:.2f}",
+        f"{maxnumber - 1}",
+        f"{frequency_pvalue(statistic, picknumber, maxnumber):.4f}",
+        f"{monte_carlo_pvalue(simulated['chi_square'], statistic):.4f}",
+    )
+    console.print(table)
+
+    for name, size, title in (("all_pairs", 2, "Pairs"), ("all_triplets", 3, "Triplets")):
+        maxima = simulated["pair" if size == 2 else "triplet"]
+        table = Table(title=f"Most Common {title}")
+        table.add_column(title[:-1], justify="center", style="magenta")
+        table.add_column("Frequency", justify="center", style="cyan")
+        table.add_column("Expected", justify="center")
+        table.add_column("p-value (This One)", justify="right")
+        table.add_column("p-value (Any One)", justify="right", style="green")
+        expected = draw_count * comb(maxnumber - size, picknumber - size) / comb(maxnumber, picknumber)
+        for combination, freq in stats[name].most_common(top):
+            table.add_row(
+                f"{combination}",
+                f"{freq}",
+                f"{expected:.1f}",
+                f"{binomial_tail(freq, draw_count, size, picknumber, maxnumber):.4f}",
+                f"{monte_carlo_pvalue(maxima, freq):.4f}",
+            )
+        console.print(table)
+
+    console.print(f"[bold yellow]Draws analyzed:[/bold yellow] {draw_count:,}")
+    console.print(f"[bold yellow]Simulated histories:[/bold yellow] {history_count:,}")
+    console.print("\"This One\" is the chance of that one combination being drawn as often. \"Any One\" is the chance of the most common combination of a random history being drawn as often, which allows for picking the top one out of all of them.")
+
+
+def significance_lotto():
+    load_dotenv()
+    lotto_type = os.getenv("LOTTO", "tuesday").lower()
+    history_count = int(os.getenv("SIMULATIONS", 100000))
+    top = int(os.getenv("TOP", 5))
+    # One worker per core by default, since a single core takes about two minutes for 100,000 histories of 2,000 draws
+    workers = int(os.getenv("WORKERS", os.cpu_count() or 1))
+    seed = int(os.getenv("SEED") or np.random.SeedSequence().entropy)
+
+    # Lotto-specific settings
+    if lotto_type == "tuesday":
+        maxnumber = 47
+    elif lotto_type == "thursday":
+        maxnumber = 35
+    elif lotto_type == "saturday":
+        maxnumber = 45
+    else:
+        console.print("[red]Invalid LOTTO type specified.[/red]")
+        return
+
+    sources, picknumber, extra_count = history_sources(lotto_type, os.getenv("HISTORY"))
+    draws = np.concatenate([block["main"] for block in iter_history(sources, picknumber, extra_count)])
+    stats = collect_stats(draws, picknumber, maxnumber)
+
+    seeds = spawn_seeds(seed, workers)
+
+    def run_histories():
+        if workers > 1:
+            return simulate_parallel(history_count, len(draws), picknumber, maxnumber, seeds)
+        return simulate_histories(history_count, len(draws), picknumber, maxnumber, seeds[0])
+
+    # Random histories depend on the draw count alone, and only a fixed SEED repeats them
+    if os.getenv("SEED"):
+        params = {"histories": history_count, "draws": len(draws), "workers": workers, "seed": seed}
+        simulated = result_cache.cached("significance", lotto_type, (), params, run_histories)
+    else:
+        simulated = run_histories()
+
+    display_significance(lotto_type, stats, simulated, picknumber, maxnumber, top)
+    console.print(f"[bold yellow]Seed:[/bold yellow] {seed}")
+
+
+# Main block
+if __name__ == "__main__":
+    significance_lotto()
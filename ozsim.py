@@ -1,12 +1,15 @@
 import os
 import random
-from rich.console import Console
-from rich.table import Table
-from rich.progress import track
+import hashlib
+import numpy as np
+from math import comb, sqrt
+from fractions import Fraction
 from collections import Counter
-
-# Initialize rich console
-console = Console()
+from ozhistory import find_draw, load_history
+from ozoutput import console, output_format, track, write_output, Table
+from ozprofile import profiler
+from ozcache import result_cache
+from oztickets import binomial_table, encode_games, encode_numbers, floyd_sample, generate_powerballs, generate_tickets, popcount, unrank_masks, TicketBook
 
 # Division details
 DIVISIONS = {
@@ -40,37 +43,668 @@ DIVISIONS = {
     ],
 }
 
+# Division marking an invalid ticket in bulk checks
+INVALID_TICKET = 255
+
 # Function to generate random numbers
-def generate_numbers(count, max_number):
-    return sorted(random.sample(range(1, max_number + 1), count))
+def generate_numbers(count, max_number, rng=random):
+    return sorted(rng.sample(range(1, max_number + 1), count))
 
 # Function to generate games
 def generate_games(game_count, picknumber, maxnumber, powerball_max=None):
     games = []
     for _ in track(range(game_count), description="[green]Generating games..."):
         main_numbers = sorted(random.sample(range(1, maxnumber + 1), picknumber))
+        if powerball_max:
+            main_numbers.append(random.randint(1, powerball_max))
         games.append(main_numbers)
-    if powerball_max:
-        powerball = random.randint(1, powerball_max)
-        games.append(main_numbers + [powerball])
     return games
 
-# Function to check game divisions
+# Function to generate games in chunks of (games, picknumber) arrays, so only one chunk is held in memory at a time
+def generate_game_chunks(game_count, picknumber, maxnumber, powerball_max=None, chunk_size=100000, rng=None):
+    rng = rng if rng is not None else np.random.default_rng()
+    for start in range(0, game_count, chunk_size):
+        chunk = generate_tickets(min(chunk_size, game_count - start), picknumber, maxnumber, rng)
+        if powerball_max:
+            chunk = np.column_stack([chunk, generate_powerballs(len(chunk), powerball_max, rng)])
+        yield chunk
+
+# Function to check game divisions (reference implementation for the batch checker below)
 def check_division(game, winning, supplementary, divisions):
-    match_counts = Counter(game) & Counter(winning)
+    # Anything after the main numbers is the ticket's powerball, matched only against the powerball draw
+    main_numbers, powerball = game[:len(winning)], game[len(winning):]
+    match_counts = Counter(main_numbers) & Counter(winning)
     winning_count = sum(match_counts.values())
-    supplementary_count = sum(1 for num in game if num in supplementary)
+    supplementary_count = sum(1 for num in (powerball or main_numbers) if num in supplementary)
 
     for division, req_winning, req_supp in divisions:
         if winning_count == req_winning and supplementary_count == req_supp:
             return division
     return None
 
+# Function to build a (winning matches, supplementary matches) -> division lookup table, 0 meaning no division
+def division_table(divisions, picknumber):
+    table = np.zeros((picknumber + 1, picknumber + 1), dtype=np.uint8)
+    for division, req_winning, req_supp in reversed(divisions):
+        table[req_winning, req_supp] = division
+    return table
+
+
+# Function to check a batch of encoded games, returning the division of each game (0 when it did not win)
+def check_divisions(masks, powerballs, winning, supplementary, table):
+    winning_mask = encode_numbers(winning)
+    supplementary_mask = encode_numbers(supplementary)
+    winning_count = popcount(masks & winning_mask)
+    supplementary_count = popcount(masks & supplementary_mask)
+
+    # Tickets carrying their own powerball only match it against the powerball draw
+    has_powerball = powerballs > 0
+    if has_powerball.any():
+        powerball_match = np.isin(powerballs, np.asarray(supplementary, dtype=np.uint8))
+        supplementary_count = np.where(has_powerball, powerball_match, supplementary_count)
+
+    return table[winning_count, supplementary_count]
+
+
+# Function to tally the divisions of a batch of games
+def count_divisions(divisions):
+    counts = np.bincount(divisions, minlength=1)
+    return Counter({division: int(count) for division, count in enumerate(counts) if division and count})
+
+
+# Function to check a stream of game chunks, keeping only the per-division counts
+def check_game_chunks(chunks, picknumber, winning, supplementary, divisions):
+    table = division_table(divisions, picknumber)
+    results = Counter()
+    for chunk in chunks:
+        masks, powerballs = encode_games(chunk, picknumber)
+        results.update(count_divisions(check_divisions(masks, powerballs, winning, supplementary, table)))
+    return results
+
+
+# Function to derive independent, reproducible seeds from one master seed
+def spawn_seeds(seed, count):
+    return [int(child.generate_state(1, np.uint64)[0]) for child in np.random.SeedSequence(seed).spawn(count)]
+
+
+# Function to simulate a share of the games with its own random number stream
+def simulate_games(game_count, picknumber, maxnumber, powerball_max, winning, supplementary, divisions, chunk_size, seed):
+    chunks = generate_game_chunks(game_count, picknumber, maxnumber, powerball_max, chunk_size, np.random.default_rng(seed))
+    return check_game_chunks(chunks, picknumber, winning, supplementary, divisions)
+
+
+# Function to split the games across a process pool and merge the per-division counts
+def simulate_parallel(game_count, picknumber, maxnumber, powerball_max, winning, supplementary, divisions, chunk_size, seeds):
+    # Imported here, single-process runs never need the process pool
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    workers = len(seeds)
+    shares = [game_count // workers + (1 if i < game_count % workers else 0) for i in range(workers)]
+    results = Counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(simulate_games, share, picknumber, maxnumber, powerball_max, winning, supplementary, divisions, chunk_size, seed)
+            for share, seed in zip(shares, seeds)
+        ]
+        for future in track(as_completed(futures), total=workers, description="[green]Simulating games..."):
+            results.update(future.result())
+    return results
+
+
+# Function to load a ticket book, either a binary TicketBook file or one comma-separated ticket per line.
+# Tickets are checked as in MODE=check, and any invalid one raises a ValueError naming its lines.
+def load_tickets(filename, picknumber, maxnumber, powerball_max):
+    width = picknumber + bool(powerball_max)
+    if TicketBook.is_book_file(filename):
+        book = TicketBook.load(filename)
+        if (book.picknumber, book.maxnumber) != (picknumber, maxnumber):
+            raise ValueError(f"{filename} holds {book.picknumber} from {book.maxnumber} tickets, not {picknumber} from {maxnumber}.")
+        tickets = book.to_array()
+        counts, lines = np.full(len(tickets), tickets.shape[1]), np.arange(1, len(tickets) + 1)
+        tickets = np.pad(tickets, ((0, 0), (0, max(0, width - tickets.shape[1]))))[:, :width]
+    else:
+        with open(filename, "rb") as file:
+            tickets, counts = parse_ticket_lines(np.frombuffer(file.read(), dtype=np.uint8), width)
+        # Blank lines are skipped, as they always were
+        lines = np.flatnonzero(counts) + 1
+        tickets, counts = tickets[counts > 0], counts[counts > 0]
+
+    if not len(tickets):
+        raise ValueError(f"{filename} holds no tickets.")
+    _, _, valid = validate_tickets(tickets, counts, picknumber, maxnumber, powerball_max)
+    if not valid.all():
+        bad = lines[~valid].tolist()
+        listed = ", ".join(map(str, bad[:10])) + (f" and {len(bad) - 10:,} more" if len(bad) > 10 else "")
+        raise ValueError(f"{filename}: invalid tickets on line{'s' if len(bad) > 1 else ''} {listed}. Each needs {picknumber} different numbers from 1 to {maxnumber}{f' and optionally a powerball from 1 to {powerball_max}' if powerball_max else ''}.")
+    if len(np.unique(counts)) > 1:
+        raise ValueError(f"{filename}: tickets need a powerball on every line or on none.")
+    return tickets[:, :counts[0]].astype(np.int64)
+
+
+# Function to load the ticket book from TICKETS, or generate random tickets when no file is given
+def make_book(tickets_file, book_size, picknumber, maxnumber, powerball_max, rng):
+    if tickets_file:
+        return load_tickets(tickets_file, picknumber, maxnumber, powerball_max)
+    return np.array(next(generate_game_chunks(book_size, picknumber, maxnumber, powerball_max, rng=rng)))
+
+
+# Function to hash the tickets of a book, so cached results follow its content whatever file or seed it came from
+def book_hash(book):
+    digest = hashlib.sha256(str(book.shape).encode())
+    digest.update(np.ascontiguousarray(book, dtype=np.int64).tobytes())
+    return digest.hexdigest()
+
+
+# Function to build an inverted index from each number to the tickets containing it, in CSR layout
+def build_number_index(numbers, maxnumber):
+    tickets = np.repeat(np.arange(len(numbers)), numbers.shape[1])
+    flat = numbers.ravel()
+    indptr = np.zeros(maxnumber + 2, dtype=np.int64)
+    np.cumsum(np.bincount(flat, minlength=maxnumber + 1), out=indptr[1:])
+    return indptr, tickets[np.argsort(flat, kind="stable")]
+
+
+# Function to list every (draw, ticket) pair of a block of draws that shares a number, once per shared number
+def index_hits(index, drawn):
+    indptr, tickets = index
+    starts = indptr[drawn].ravel()
+    lengths = indptr[drawn + 1].ravel() - starts
+    draw_ids = np.repeat(np.arange(len(drawn)).repeat(drawn.shape[1]), lengths)
+    offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    return draw_ids, tickets[np.repeat(starts, lengths) + offsets]
+
+
+# Function to generate a block of random draws, main numbers plus supplementaries or powerball
+def generate_draws(rng, draw_count, picknumber, maxnumber, supplementary_count, powerball_max=None):
+    drawn = picknumber if powerball_max else picknumber + supplementary_count
+    chosen = floyd_sample(rng, draw_count, drawn, np.arange(1, maxnumber + 1))
+    # Shuffle each draw so the main/supplementary split is uniform too
+    chosen = np.take_along_axis(chosen, np.argsort(rng.random(chosen.shape), axis=1), axis=1)
+    if powerball_max:
+        return chosen, rng.integers(1, powerball_max + 1, (draw_count, supplementary_count))
+    return chosen[:, :picknumber], chosen[:, picknumber:]
+
+
+# Function to score a ticket book against simulated draws, touching only tickets that share numbers with each draw
+def simulate_draws(book, draw_count, picknumber, maxnumber, supplementary_count, powerball_max, divisions, chunk_size, seed):
+    rng = np.random.default_rng(seed)
+    table = division_table(divisions, picknumber)
+    ticket_count = len(book)
+    main_index = build_number_index(book[:, :picknumber], maxnumber)
+    # Tickets with their own powerball match it against the powerball draw, otherwise the main numbers do
+    supp_index = build_number_index(book[:, picknumber:], maxnumber) if book.shape[1] > picknumber else main_index
+    block = max(1, chunk_size // ticket_count)
+
+    # wins counts winning tickets per division; hits counts draws with at least one win, 0 meaning any division
+    wins, hits = Counter(), Counter()
+    for start in range(0, draw_count, block):
+        main_drawn, supp_drawn = generate_draws(rng, min(block, draw_count - start), picknumber, maxnumber, supplementary_count, powerball_max)
+        main_draw, main_ticket = index_hits(main_index, main_drawn)
+        supp_draw, supp_ticket = index_hits(supp_index, supp_drawn)
+
+        # Pack main matches into the low nibble and supplementary matches into the high one
+        keys = np.concatenate([main_draw * ticket_count + main_ticket, supp_draw * ticket_count + supp_ticket])
+        weights = np.concatenate([np.ones(len(main_draw), dtype=np.int64), np.full(len(supp_draw), 16, dtype=np.int64)])
+        keys, inverse = np.unique(keys, return_inverse=True)
+        codes = np.bincount(inverse, weights=weights).astype(np.int64)
+        won = table[codes & 15, codes >> 4]
+        draw_ids = keys // ticket_count
+
+        wins.update(count_divisions(won))
+        winning_draws = np.unique(draw_ids[won > 0] * 16 + won[won > 0])
+        hits.update(count_divisions(winning_draws & 15))
+        hits[0] += len(np.unique(draw_ids[won > 0]))
+    return wins, hits
+
+
+# Function to split the draws across a process pool and merge the counts
+def simulate_draws_parallel(book, draw_count, picknumber, maxnumber, supplementary_count, powerball_max, divisions, chunk_size, seeds):
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    workers = len(seeds)
+    shares = [draw_count // workers + (1 if i < draw_count % workers else 0) for i in range(workers)]
+    wins, hits = Counter(), Counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(simulate_draws, book, share, picknumber, maxnumber, supplementary_count, powerball_max, divisions, chunk_size, seed)
+            for share, seed in zip(shares, seeds)
+        ]
+        for future in track(as_completed(futures), total=workers, description="[green]Simulating draws..."):
+            worker_wins, worker_hits = future.result()
+            wins.update(worker_wins)
+            hits.update(worker_hits)
+    return wins, hits
+
+
+# Function to compute the Wilson score interval of a hit rate
+def wilson_interval(hits, trials, z=1.96):
+    if not trials:
+        return 0.0, 0.0
+    rate = hits / trials
+    centre = (rate + z * z / (2 * trials)) / (1 + z * z / trials)
+    margin = z * sqrt(rate * (1 - rate) / trials + z * z / (4 * trials * trials)) / (1 + z * z / trials)
+    return max(0.0, centre - margin), min(1.0, centre + margin)
+
+
+# Function to list per-division hit rates of a ticket book over many draws, division 0 standing for any division
+def draw_records(lotto_type, wins, hits, draw_count):
+    records = []
+    for division, _, _ in DIVISIONS[lotto_type] + [(0, 0, 0)]:
+        winning_tickets = wins[division] if division else sum(wins.values())
+        low, high = wilson_interval(hits[division], draw_count)
+        records.append({
+            "division": division,
+            "winning_tickets": winning_tickets,
+            "per_draw": winning_tickets / draw_count,
+            "winning_draws": hits[division],
+            "hit_rate": hits[division] / draw_count,
+            "ci_low": low,
+            "ci_high": high,
+        })
+    return records
+
+
+# Function to display per-division hit rates of a ticket book over many draws
+def display_draw_results(lotto_type, wins, hits, ticket_count, draw_count, seed):
+    console.rule(f"[bold green]Ticket Book Simulation Results ({lotto_type.capitalize()} Draw)[/bold green]")
+    table = Table(title=f"Division Hit Rates over {draw_count:,} Draws")
+    table.add_column("Division", justify="right")
+    table.add_column("Winning Tickets", justify="right")
+    table.add_column("Per Draw", justify="right")
+    table.add_column("Winning Draws", justify="right")
+    table.add_column("Hit Rate", justify="right")
+    table.add_column("95% CI", justify="left")
+
+    for record in draw_records(lotto_type, wins, hits, draw_count):
+        table.add_row(
+            str(record["division"]) if record["division"] else "Any",
+            f"{record['winning_tickets']:,}",
+            f"{record['per_draw']:.6f}",
+            f"{record['winning_draws']:,}",
+            f"{record['hit_rate']:.4%}",
+            f"{record['ci_low']:.4%} - {record['ci_high']:.4%}",
+        )
+
+    console.print(table)
+    console.print(f"[bold yellow]Tickets in book:[/bold yellow] {ticket_count:,}")
+    console.print(f"[bold yellow]Number of draws simulated:[/bold yellow] {draw_count:,}")
+    console.print(f"[bold yellow]Seed:[/bold yellow] {seed}")
+
+
+# Function to score a ticket book against every main draw in a range of colex ranks
+def enumerate_rank_range(book_masks, picknumber, maxnumber, start, stop, block):
+    binomials = binomial_table(maxnumber, picknumber)
+    # matches counts (draw, ticket) pairs per main match count; best and any_match count draws
+    matches = np.zeros(picknumber + 1, dtype=np.int64)
+    best = np.zeros(picknumber + 1, dtype=np.int64)
+    any_match = np.zeros(picknumber + 1, dtype=np.int64)
+    for block_start in range(start, stop, block):
+        draw_masks = unrank_masks(np.arange(block_start, min(block_start + block, stop), dtype=np.int64), picknumber, binomials)
+        counts = popcount(draw_masks[:, None] & book_masks[None, :])
+        matches += np.bincount(counts.ravel(), minlength=picknumber + 1)
+        best += np.bincount(counts.max(axis=1), minlength=picknumber + 1)
+        for req_winning in range(picknumber + 1):
+            any_match[req_winning] += np.count_nonzero((counts == req_winning).any(axis=1))
+    return matches, best, any_match
+
+
+# Function to enumerate every possible main draw in rank ranges, spread over a process pool when asked
+def enumerate_draws(book, picknumber, maxnumber, chunk_size, workers):
+    total = comb(maxnumber, picknumber)
+    book_masks, _ = encode_games(book, picknumber)
+    block = max(1024, chunk_size * 10 // len(book))
+    ranges = np.linspace(0, total, workers * 8 + 1, dtype=np.int64)
+    tasks = [(book_masks, picknumber, maxnumber, int(start), int(stop), block) for start, stop in zip(ranges[:-1], ranges[1:])]
+
+    results = []
+    if workers > 1:
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(enumerate_rank_range, *task) for task in tasks]
+            for future in track(as_completed(futures), total=len(futures), description="[green]Enumerating draws..."):
+                results.append(future.result())
+    else:
+        for task in track(tasks, description="[green]Enumerating draws..."):
+            results.append(enumerate_rank_range(*task))
+    return tuple(sum(result[i] for result in results) for i in range(3))
+
+
+# Function to parse a block of whole text lines into tickets, one comma-separated ticket per line.
+# Digits are read straight from the bytes, so there is no per-line Python work. Every line gets a row, so rows
+# line up with line numbers; blank lines and lines without numbers have a count of 0.
+# Returns the tickets as width columns, zero-padded, and the count of numbers on each line.
+def parse_ticket_lines(data, width):
+    # Two leading pad bytes, so looking back from any number stays inside the block
+    data = np.concatenate([np.full(2, 10, dtype=np.uint8), data])
+    digits = data - np.uint8(48)
+    is_digit = digits < 10
+    ends = np.flatnonzero(is_digit & ~np.append(is_digit[1:], False))
+    values = digits[ends].astype(np.int16)
+    tens = is_digit[ends - 1]
+    values[tens] += 10 * digits[ends[tens] - 1]
+    # Every lotto number has one or two digits, so longer ones are simply out of range
+    values[tens & is_digit[ends - 2]] = 999
+
+    # Numbers up to each line end, past the pad bytes; a last line without a line break still counts
+    bounds = np.searchsorted(ends, np.flatnonzero(data[2:] == 10) + 2)
+    if len(data) > 2 and data[-1] != 10:
+        bounds = np.append(bounds, len(ends))
+    counts = np.diff(bounds, prepend=0)
+    if len(counts) and (counts == width).all():
+        return values.reshape(-1, width), counts
+    # Lines of other lengths, e.g. Thursday tickets with and without a powerball, are placed number by number
+    tickets = np.zeros((len(counts), width), dtype=np.int16)
+    offsets = np.arange(len(values)) - np.repeat(np.cumsum(counts) - counts, counts)
+    keep = offsets < width
+    tickets[np.repeat(np.arange(len(counts)), counts)[keep], offsets[keep]] = values[keep]
+    return tickets, counts
+
+
+# Function to split a text ticket file into byte ranges of whole lines, one per task
+def ticket_line_ranges(filename, parts):
+    size = os.path.getsize(filename)
+    data = np.memmap(filename, dtype=np.uint8, mode="r") if size else np.zeros(0, dtype=np.uint8)
+    bounds = [0]
+    for part in range(1, parts):
+        # Each range ends just after the first newline past its even share
+        newline = np.flatnonzero(data[max(bounds[-1], size * part // parts):][:1 << 16] == 10)
+        if len(newline):
+            bounds.append(max(bounds[-1], size * part // parts) + int(newline[0]) + 1)
+    bounds.append(size)
+    return [(start, stop) for start, stop in zip(bounds[:-1], bounds[1:]) if stop > start]
+
+
+# Function to stream the tickets of a file range as (masks, powerballs, valid) chunks, from a ticket book or a text file
+def ticket_chunks(filename, start, stop, picknumber, maxnumber, powerball_max, chunk_size):
+    if TicketBook.is_book_file(filename):
+        book = TicketBook.load(filename)
+        for first in range(start, stop, chunk_size):
+            masks = np.asarray(book.masks[first:min(first + chunk_size, stop)])
+            powerballs = np.zeros(len(masks), dtype=np.uint8) if book.powerballs is None else np.asarray(book.powerballs[first:first + len(masks)])
+            yield masks, powerballs, np.ones(len(masks), dtype=bool)
+        return
+
+    data = np.memmap(filename, dtype=np.uint8, mode="r")
+    # Roughly chunk_size lines of up to 24 bytes at a time, cut after the last whole line
+    block_bytes = max(1 << 16, chunk_size * 24)
+    position = start
+    while position < stop:
+        block = data[position:min(position + block_bytes, stop)]
+        if position + len(block) < stop:
+            newlines = np.flatnonzero(block == 10)
+            if len(newlines):
+                block = block[:int(newlines[-1]) + 1]
+            else:
+                # A line longer than the block is read on to its line break, or to the end of the range
+                end = position + len(block)
+                while end < stop:
+                    newline = np.flatnonzero(data[end:min(end + block_bytes, stop)] == 10)
+                    if len(newline):
+                        end += int(newline[0]) + 1
+                        break
+                    end = min(end + block_bytes, stop)
+                block = data[position:end]
+        position += len(block)
+        tickets, counts = parse_ticket_lines(np.asarray(block), picknumber + bool(powerball_max))
+        if len(tickets):
+            yield validate_tickets(tickets, counts, picknumber, maxnumber, powerball_max)
+
+
+# Function to check parsed tickets, returning their masks, powerballs and which of them are valid.
+# A ticket needs its main numbers, in range and all different, and for Thursday optionally a powerball.
+def validate_tickets(tickets, counts, picknumber, maxnumber, powerball_max):
+    main = tickets[:, :picknumber]
+    valid = (main >= 1).all(axis=1) & (main <= maxnumber).all(axis=1)
+    valid &= (counts == picknumber) | ((counts == picknumber + 1) & bool(powerball_max))
+    if powerball_max:
+        valid &= (counts == picknumber) | ((tickets[:, picknumber] >= 1) & (tickets[:, picknumber] <= powerball_max))
+    masks, powerballs = encode_games(np.where(valid[:, None], tickets, 1), picknumber)
+    # Repeated numbers leave fewer bits set than numbers on the ticket
+    valid &= popcount(masks) == picknumber
+    return masks, powerballs, valid
+
+
+# Function to check the tickets of a file range against a draw, returning each ticket's division (INVALID_TICKET for bad tickets)
+def check_ticket_range(filename, start, stop, picknumber, maxnumber, powerball_max, winning, supplementary, table, chunk_size):
+    parts = []
+    for masks, powerballs, valid in ticket_chunks(filename, start, stop, picknumber, maxnumber, powerball_max, chunk_size):
+        parts.append(np.where(valid, check_divisions(masks, powerballs, winning, supplementary, table), INVALID_TICKET).astype(np.uint8))
+    return np.concatenate(parts) if parts else np.zeros(0, dtype=np.uint8)
+
+
+# Function to write divisions one per line, the division number or 0, and x for an invalid ticket
+def write_divisions(file, divisions):
+    lines = np.empty((len(divisions), 2), dtype=np.uint8)
+    lines[:, 0] = np.where(divisions == INVALID_TICKET, ord("x"), divisions + ord("0"))
+    lines[:, 1] = ord("\n")
+    file.write(lines.tobytes())
+
+
+# Function to check every ticket of a file against a draw, writing per-ticket divisions and returning the totals.
+# Ranges are checked in order, over a process pool when asked, so memory is bounded by the tasks in flight.
+def check_tickets(tickets_file, results_file, picknumber, maxnumber, powerball_max, winning, supplementary, divisions, chunk_size, workers):
+    table = division_table(divisions, picknumber)
+    if TicketBook.is_book_file(tickets_file):
+        book = TicketBook.load(tickets_file)
+        if (book.picknumber, book.maxnumber) != (picknumber, maxnumber):
+            raise ValueError(f"{tickets_file} holds {book.picknumber} from {book.maxnumber} tickets, not {picknumber} from {maxnumber}.")
+        bounds = np.linspace(0, len(book), workers * 8 + 1, dtype=np.int64)
+        ranges = [(int(start), int(stop)) for start, stop in zip(bounds[:-1], bounds[1:]) if stop > start]
+    else:
+        ranges = ticket_line_ranges(tickets_file, workers * 8)
+    tasks = [(tickets_file, start, stop, picknumber, maxnumber, powerball_max, winning, supplementary, table, chunk_size) for start, stop in ranges]
+
+    totals = np.zeros(INVALID_TICKET + 1, dtype=np.int64)
+    with open(results_file, "wb") as file:
+        if workers > 1:
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = executor.map(check_ticket_range, *zip(*tasks))
+                for result in track(results, total=len(tasks), description="[green]Checking tickets..."):
+                    totals += np.bincount(result, minlength=INVALID_TICKET + 1)
+                    write_divisions(file, result)
+        else:
+            for task in track(tasks, description="[green]Checking tickets..."):
+                result = check_ticket_range(*task)
+                totals += np.bincount(result, minlength=INVALID_TICKET + 1)
+                write_divisions(file, result)
+    return Counter({division: int(count) for division, count in enumerate(totals[:INVALID_TICKET]) if division and count}), int(totals[0]), int(totals[INVALID_TICKET])
+
+
+# Function to display the division totals of a ticket file checked against a draw
+def display_check(lotto_type, results, ticket_count, invalid, winning, supplementary, results_file):
+    console.rule(f"[bold green]Ticket Check Results ({lotto_type.capitalize()} Draw)[/bold green]")
+    table = Table(title="Winning Tickets by Division")
+    table.add_column("Division", justify="right")
+    table.add_column("Winning Tickets", justify="right")
+    table.add_column("Share of Tickets", justify="right")
+    for division, _, _ in DIVISIONS[lotto_type]:
+        table.add_row(str(division), f"{results.get(division, 0):,}", f"{results.get(division, 0) / max(ticket_count, 1):.6%}")
+    console.print(table)
+
+    console.print(f"\n[bold yellow]Winning Numbers:[/bold yellow] {winning}")
+    if lotto_type == "thursday":
+        console.print(f"[bold yellow]Powerball Number:[/bold yellow] [red]{supplementary}[/red]")
+    else:
+        console.print(f"[bold yellow]Supplementary Numbers:[/bold yellow] [red]{supplementary}[/red]")
+    console.print(f"[bold yellow]Tickets checked:[/bold yellow] {ticket_count:,}")
+    console.print(f"[bold yellow]Total winning tickets:[/bold yellow] {sum(results.values()):,}")
+    if invalid:
+        console.print(f"[bold yellow]Invalid tickets:[/bold yellow] [red]{invalid:,}[/red] (marked x)")
+    console.print(f"[bold yellow]Divisions written to:[/bold yellow] {results_file}")
+
+
+# Function to compute the exact probability of a ticket matching each (winning, supplementary) count
+def match_probabilities(picknumber, maxnumber, supplementary_count, powerball_max=None):
+    total = comb(maxnumber, picknumber)
+    probabilities = {}
+    for req_winning in range(picknumber + 1):
+        if powerball_max:
+            # The powerball comes from its own barrel, independent of the main numbers
+            main_ways = comb(picknumber, req_winning) * comb(maxnumber - picknumber, picknumber - req_winning)
+            probabilities[(req_winning, 1)] = Fraction(main_ways, total * powerball_max)
+            probabilities[(req_winning, 0)] = Fraction(main_ways * (powerball_max - 1), total * powerball_max)
+            continue
+        for req_supp in range(min(supplementary_count, picknumber - req_winning) + 1):
+            ways = (
+                comb(picknumber, req_winning)
+                * comb(supplementary_count, req_supp)
+                * comb(maxnumber - picknumber - supplementary_count, picknumber - req_winning - req_supp)
+            )
+            probabilities[(req_winning, req_supp)] = Fraction(ways, total)
+    return probabilities
+
+
+# Function to compute the exact probability of a ticket winning each division
+def division_probabilities(divisions, picknumber, maxnumber, supplementary_count, powerball_max=None):
+    table = division_table(divisions, picknumber)
+    probabilities = Counter()
+    for (req_winning, req_supp), probability in match_probabilities(picknumber, maxnumber, supplementary_count, powerball_max).items():
+        if table[req_winning, req_supp]:
+            probabilities[int(table[req_winning, req_supp])] += probability
+    return probabilities
+
+
+# Function to list the exact division odds for a book of independent random tickets, division 0 standing for any division
+def odds_records(lotto_type, probabilities, ticket_count):
+    records = []
+    for division, _, _ in DIVISIONS[lotto_type] + [(0, 0, 0)]:
+        probability = probabilities[division] if division else sum(probabilities.values())
+        records.append({
+            "division": division,
+            "probability": float(probability),
+            "odds_one_in": float(1 / probability),
+            "expected_wins": float(probability * ticket_count),
+            "at_least_one": 1 - (1 - float(probability)) ** ticket_count,
+        })
+    return records
+
+
+# Function to display the exact division odds for a book of independent random tickets
+def display_odds(lotto_type, probabilities, ticket_count):
+    console.rule(f"[bold green]Exact Division Odds ({lotto_type.capitalize()} Draw)[/bold green]")
+    table = Table(title=f"Division Odds for {ticket_count:,} Ticket{'s' if ticket_count > 1 else ''}")
+    table.add_column("Division", justify="right")
+    table.add_column("Probability per Ticket", justify="right")
+    table.add_column("Odds", justify="right")
+    table.add_column("Expected Wins", justify="right")
+    table.add_column("At Least One Win", justify="right")
+
+    for record in odds_records(lotto_type, probabilities, ticket_count):
+        table.add_row(
+            str(record["division"]) if record["division"] else "Any",
+            f"{record['probability']:.10f}",
+            f"1 in {record['odds_one_in']:,.2f}",
+            f"{record['expected_wins']:,.6f}",
+            f"{record['at_least_one']:.6%}",
+        )
+    console.print(table)
+
+
+# Function to compare simulated division counts with their exact expectations
+def validation_records(lotto_type, results, trials, probabilities):
+    records = []
+    for division, _, _ in DIVISIONS[lotto_type]:
+        probability = float(probabilities[division])
+        expected = trials * probability
+        records.append({
+            "division": division,
+            "observed": results[division],
+            "expected": expected,
+            "z_score": (results[division] - expected) / sqrt(expected * (1 - probability)) if expected else 0.0,
+        })
+    return records
+
+
+# Function to display simulated division counts next to their exact expectations
+def display_validation(lotto_type, results, trials, probabilities):
+    console.rule(f"[bold green]Simulation vs Exact Odds ({lotto_type.capitalize()} Draw)[/bold green]")
+    table = Table(title=f"Validation over {trials:,} Tickets")
+    table.add_column("Division", justify="right")
+    table.add_column("Observed", justify="right")
+    table.add_column("Expected", justify="right")
+    table.add_column("Deviation", justify="right")
+    table.add_column("Z-Score", justify="right")
+
+    failed = 0
+    for record in validation_records(lotto_type, results, trials, probabilities):
+        observed, expected, z_score = record["observed"], record["expected"], record["z_score"]
+        style = "red" if abs(z_score) > 4 else "green"
+        failed += abs(z_score) > 4
+        table.add_row(
+            str(record["division"]),
+            f"{observed:,}",
+            f"{expected:,.2f}",
+            f"{(observed - expected) / expected:+.3%}" if expected else "-",
+            f"[{style}]{z_score:+.2f}[/{style}]",
+        )
+    console.print(table)
+    if failed:
+        console.print(f"[red]{failed} division(s) deviate by more than 4 standard deviations[/red]")
+    else:
+        console.print("[green]All divisions within 4 standard deviations of the exact odds[/green]")
+
+
+# Function to get the exact expected winning tickets per draw of each division from the main match counts of every draw
+def enumeration_expected(lotto_type, matches, picknumber, maxnumber, supplementary_count, powerball_max):
+    total = comb(maxnumber, picknumber)
+    table = division_table(DIVISIONS[lotto_type], picknumber)
+
+    # Split each main match count over the supplementary outcomes, exactly
+    expected = Counter()
+    for req_winning, count in enumerate(matches.tolist()):
+        for req_supp in range(picknumber + 1):
+            if not table[req_winning, req_supp]:
+                continue
+            if powerball_max:
+                probability = Fraction(1 if req_supp else powerball_max - 1, powerball_max)
+            else:
+                # The ticket's unmatched numbers are among the undrawn ones the supplementaries come from
+                probability = Fraction(
+                    comb(picknumber - req_winning, req_supp) * comb(maxnumber - 2 * picknumber + req_winning, supplementary_count - req_supp),
+                    comb(maxnumber - picknumber, supplementary_count),
+                )
+            expected[int(table[req_winning, req_supp])] += Fraction(count, total) * probability
+    return expected
+
+
+# Function to display the exact division expectations and best-match distribution of a ticket book
+def display_enumeration(lotto_type, book, matches, best, any_match, picknumber, maxnumber, supplementary_count, powerball_max):
+    total = comb(maxnumber, picknumber)
+    expected = enumeration_expected(lotto_type, matches, picknumber, maxnumber, supplementary_count, powerball_max)
+    console.rule(f"[bold green]Exhaustive Draw Enumeration ({lotto_type.capitalize()} Draw)[/bold green]")
+    division_results = Table(title=f"Expected Winning Tickets per Draw over all {total:,} Draws")
+    division_results.add_column("Division", justify="right")
+    division_results.add_column("Expected Wins", justify="right")
+    division_results.add_column("Per Ticket", justify="right")
+    for division, _, _ in DIVISIONS[lotto_type]:
+        division_results.add_row(str(division), f"{float(expected[division]):.10f}", f"{float(expected[division] / len(book)):.10f}")
+    console.print(division_results)
+
+    match_results = Table(title="Main Number Matches")
+    match_results.add_column("Matches", justify="right")
+    match_results.add_column("Best Match in Book", justify="right")
+    match_results.add_column("At Least One Ticket", justify="right")
+    for req_winning in range(picknumber, -1, -1):
+        match_results.add_row(str(req_winning), f"{best[req_winning] / total:.8%}", f"{any_match[req_winning] / total:.8%}")
+    console.print(match_results)
+    console.print(f"[bold yellow]Tickets in book:[/bold yellow] {len(book):,}")
+    console.print(f"[bold yellow]Draws enumerated:[/bold yellow] {total:,}")
+
+
 # Function to simulate lotto
 def simulate_lotto():
     lotto_type = os.getenv("LOTTO", "tuesday").lower()
     winning_numbers = os.getenv("WINNING")
+    draw_date = os.getenv("DRAWDATE")
     game_count = int(os.getenv("GAMES", 100000))
+    engine = os.getenv("ENGINE", "batch").lower()
+    chunk_size = int(os.getenv("CHUNK", 100000))
+    workers = int(os.getenv("WORKERS", 1))
+    seed = int(os.getenv("SEED") or np.random.SeedSequence().entropy)
+    draw_count = int(os.getenv("DRAWS", 0))
+    tickets_file = os.getenv("TICKETS")
+    mode = os.getenv("MODE", "draws" if draw_count else "simulate").lower()
+    # OUTPUT=json or csv writes the results alone to stdout, with no tables or progress bars
+    output = output_format()
     drawn_games = game_count
 
     # Lotto-specific settings
@@ -84,8 +718,110 @@ def simulate_lotto():
         console.print("[red]Invalid LOTTO type specified.[/red]")
         return
 
-    # Generate or parse winning numbers
-    if winning_numbers:
+    # The first seed draws the winning numbers, the rest drive one worker each
+    draw_seed, *worker_seeds = spawn_seeds(seed, workers + 1)
+    draw_rng = random.Random(draw_seed)
+    powerball_max = 20 if lotto_type == "thursday" else None
+    probabilities = division_probabilities(DIVISIONS[lotto_type], picknumber, maxnumber, supplementary_count, powerball_max)
+
+    # Exact odds need no simulation at all
+    if mode == "odds":
+        try:
+            ticket_count = len(load_tickets(tickets_file, picknumber, maxnumber, powerball_max)) if tickets_file else int(os.getenv("BOOK", 1))
+        except ValueError as error:
+            console.print(f"[red]{error}")
+            return
+        with profiler.phase("render"):
+            if output:
+                write_output({"lotto": lotto_type, "mode": mode, "tickets": ticket_count, "divisions": odds_records(lotto_type, probabilities, ticket_count)}, output)
+            else:
+                display_odds(lotto_type, probabilities, ticket_count)
+        return
+
+    # Score a fixed ticket book against many simulated draws, or against every possible draw
+    if draw_count or mode == "enumerate":
+        try:
+            book = make_book(tickets_file, int(os.getenv("BOOK", 10)), picknumber, maxnumber, powerball_max, np.random.default_rng(draw_seed))
+        except ValueError as error:
+            console.print(f"[red]{error}")
+            return
+    if mode == "enumerate":
+        if powerball_max and book.shape[1] == picknumber:
+            console.print("[red]Enumerating Thursday draws needs a powerball on every ticket")
+            return
+        def run_enumeration():
+            with profiler.phase("enumerate"):
+                enumeration = enumerate_draws(book, picknumber, maxnumber, chunk_size, workers)
+            profiler.count("draws_enumerated", comb(maxnumber, picknumber), phase="enumerate")
+            return enumeration
+
+        # Every draw is checked, so the results depend on the tickets alone and always come from the cache once known
+        matches, best, any_match = result_cache.cached("enumerate", lotto_type, (), {"book": book_hash(book)}, run_enumeration)
+        with profiler.phase("render"):
+            if output:
+                total = comb(maxnumber, picknumber)
+                expected = enumeration_expected(lotto_type, matches, picknumber, maxnumber, supplementary_count, powerball_max)
+                write_output({
+                    "lotto": lotto_type,
+                    "mode": mode,
+                    "tickets": len(book),
+                    "draws": total,
+                    "divisions": [
+                        {"division": division, "expected_wins": float(expected[division]), "per_ticket": float(expected[division] / len(book))}
+                        for division, _, _ in DIVISIONS[lotto_type]
+                    ],
+                    "matches": [
+                        {"matches": req_winning, "best_match": best[req_winning] / total, "any_ticket": any_match[req_winning] / total}
+                        for req_winning in range(picknumber, -1, -1)
+                    ],
+                }, output)
+            else:
+                display_enumeration(lotto_type, book, matches, best, any_match, picknumber, maxnumber, supplementary_count, powerball_max)
+        return
+    if draw_count:
+        args = (book, draw_count, picknumber, maxnumber, supplementary_count, powerball_max, DIVISIONS[lotto_type], chunk_size)
+
+        def run_draws():
+            with profiler.phase("simulate"):
+                if workers > 1:
+                    draw_results = simulate_draws_parallel(*args, worker_seeds)
+                else:
+                    draw_results = simulate_draws(*args, worker_seeds[0])
+            profiler.count("draws_checked", draw_count, phase="simulate")
+            profiler.count("tickets_checked", len(book) * draw_count, phase="simulate")
+            return draw_results
+
+        # Only a fixed SEED repeats a run, so only those results are worth keeping
+        if os.getenv("SEED"):
+            params = {"book": book_hash(book), "draws": draw_count, "chunk": chunk_size, "workers": workers, "seed": seed}
+            wins, hits = result_cache.cached("draws", lotto_type, (), params, run_draws)
+        else:
+            wins, hits = run_draws()
+        with profiler.phase("render"):
+            if output and mode == "validate":
+                write_output({"lotto": lotto_type, "mode": mode, "tickets": len(book) * draw_count, "divisions": validation_records(lotto_type, wins, len(book) * draw_count, probabilities)}, output)
+            elif output:
+                write_output({"lotto": lotto_type, "mode": mode, "tickets": len(book), "draws": draw_count, "seed": seed, "divisions": draw_records(lotto_type, wins, hits, draw_count)}, output)
+            elif mode == "validate":
+                display_validation(lotto_type, wins, len(book) * draw_count, probabilities)
+            else:
+                display_draw_results(lotto_type, wins, hits, len(book), draw_count, seed)
+        return
+
+    if mode == "check" and not (tickets_file and (draw_date or winning_numbers)):
+        console.print("[red]MODE=check needs TICKETS and either DRAWDATE or WINNING")
+        return
+
+    # Look up, generate or parse winning numbers
+    if draw_date:
+        try:
+            draw = find_draw(load_history(lotto_type, os.getenv("HISTORY")), draw_date)
+        except ValueError as error:
+            console.print(f"[red]{error}")
+            return
+        winning = draw["main"].tolist()
+        supplementary = [num for num in draw["extra"].tolist() if num]
+    elif winning_numbers:
         winning_numbers = list(map(int, winning_numbers.split(",")))
         winning = winning_numbers[:picknumber]
         supplementary = winning_numbers[picknumber: picknumber + supplementary_count]
@@ -93,54 +829,122 @@ def simulate_lotto():
             console.print("[red]Invalid winning and/or supplementary length")
             return
     else:
-        winning = generate_numbers(picknumber, maxnumber)
+        winning = generate_numbers(picknumber, maxnumber, draw_rng)
         if lotto_type == "thursday":
-            supplementary = generate_numbers(supplementary_count, 20)
+            supplementary = generate_numbers(supplementary_count, 20, draw_rng)
         else:
-            supplementary = generate_numbers(supplementary_count, maxnumber)
+            supplementary = generate_numbers(supplementary_count, maxnumber, draw_rng)
             while set(supplementary).intersection(set(winning)):
-                supplementary = generate_numbers(supplementary_count, maxnumber)
+                supplementary = generate_numbers(supplementary_count, maxnumber, draw_rng)
 
-    # Generate random games
-    if lotto_type == "thursday":
-        games = generate_games(game_count, picknumber, maxnumber, powerball_max=20)
+    # Check a ticket file against the draw, writing every ticket's division
+    if mode == "check":
+        results_file = os.getenv("RESULTS") or f"{os.path.splitext(tickets_file)[0]}.divisions.txt"
+        try:
+            with profiler.phase("check"):
+                results, losing, invalid = check_tickets(tickets_file, results_file, picknumber, maxnumber, powerball_max, winning, supplementary, DIVISIONS[lotto_type], chunk_size, workers)
+        except ValueError as error:
+            console.print(f"[red]{error}")
+            return
+        ticket_count = sum(results.values()) + losing + invalid
+        profiler.count("tickets_checked", ticket_count, phase="check")
+        with profiler.phase("render"):
+            if output:
+                write_output({
+                    "lotto": lotto_type,
+                    "mode": mode,
+                    "tickets": ticket_count,
+                    "winning": winning,
+                    "supplementary": supplementary,
+                    "winning_tickets": sum(results.values()),
+                    "invalid_tickets": invalid,
+                    "results_file": results_file,
+                    "divisions": [{"division": division, "winning_tickets": results.get(division, 0)} for division, _, _ in DIVISIONS[lotto_type]],
+                }, output)
+            else:
+                display_check(lotto_type, results, ticket_count, invalid, winning, supplementary, results_file)
+        return
+
+    # Generate random games and simulate results
+    def run_games():
+        with profiler.phase("simulate"):
+            if engine == "reference":
+                random.seed(worker_seeds[0])
+                games = generate_games(game_count, picknumber, maxnumber, powerball_max)
+                game_results = Counter()
+                for game in track(games, description="[green]Checking games..."):
+                    division = check_division(game, winning, supplementary, DIVISIONS[lotto_type])
+                    if division:
+                        game_results[division] += 1
+            elif workers > 1:
+                game_results = simulate_parallel(game_count, picknumber, maxnumber, powerball_max, winning, supplementary, DIVISIONS[lotto_type], chunk_size, worker_seeds)
+            else:
+                # Stream generation and checking chunk by chunk, so memory stays flat however large GAMES gets
+                chunks = generate_game_chunks(game_count, picknumber, maxnumber, powerball_max, chunk_size, np.random.default_rng(worker_seeds[0]))
+                chunks = track(chunks, total=-(-game_count // chunk_size), description="[green]Simulating games...")
+                game_results = check_game_chunks(chunks, picknumber, winning, supplementary, DIVISIONS[lotto_type])
+        profiler.count("games_checked", game_count, phase="simulate")
+        return game_results
+
+    # The winning numbers are part of the key, so a DRAWDATE lookup needs no history hash
+    if os.getenv("SEED"):
+        params = {"games": game_count, "winning": winning, "supplementary": supplementary, "engine": engine, "chunk": chunk_size, "workers": workers, "seed": seed}
+        results = result_cache.cached("simulate", lotto_type, (), params, run_games)
     else:
-        games = generate_games(game_count, picknumber, maxnumber)
+        results = run_games()
 
-    # Simulate results
-    results = Counter()
-    for game in track(games, description="[green]Checking games..."):
-        division = check_division(game, winning, supplementary, DIVISIONS[lotto_type])
-        if division:
-            results[division] += 1
-
-    # Display results
-    console.rule(f"[bold green]Lotto Simulation Results ({lotto_type.capitalize()} Draw)[/bold green]")
-    table = Table(title="Division Results")
-    table.add_column("Division", justify="right")
-    table.add_column("Winning Games", justify="right")
-    table.add_column("Representation", justify="left")
-
-    # Add rows for all divisions, even if no winners
-    winning_game = 0
-    for division, req_winning, req_supp in DIVISIONS[lotto_type]:
-        game_count = results.get(division, 0)
-        winning_game += game_count
-        blue_dots = "●" * req_winning
-        red_dots = "●" * req_supp
-        table.add_row(str(division), f"{game_count:,}", f"[blue]{blue_dots}[/blue][red]{red_dots}[/red]")
+    if mode == "validate":
+        with profiler.phase("render"):
+            if output:
+                write_output({"lotto": lotto_type, "mode": mode, "tickets": game_count, "divisions": validation_records(lotto_type, results, game_count, probabilities)}, output)
+            else:
+                display_validation(lotto_type, results, game_count, probabilities)
+        return
 
-    console.print(table)
+    if output:
+        with profiler.phase("render"):
+            write_output({
+                "lotto": lotto_type,
+                "mode": mode,
+                "games": drawn_games,
+                "winning": winning,
+                "supplementary": supplementary,
+                "seed": seed,
+                "workers": workers,
+                "winning_games": sum(results.values()),
+                "divisions": [{"division": division, "winning_games": results.get(division, 0)} for division, _, _ in DIVISIONS[lotto_type]],
+            }, output)
+        return
 
-    # Display winning combination
-    console.print(f"\n[bold yellow]Winning Numbers:[/bold yellow] {winning}")
-    if lotto_type == "thursday":
-        console.print(f"[bold yellow]Powerball Number:[/bold yellow] [red]{supplementary}[/red]")
-    else:
-        console.print(f"[bold yellow]Supplementary Numbers:[/bold yellow] [red]{supplementary}[/red]")
-    console.print(f"[bold yellow]Total winning games:[/bold yellow] {winning_game:,}")
-    console.print(f"[bold yellow]Number of games drawn:[/bold yellow] {drawn_games:,}")
-    console.print(f"[bold yellow]Total non-winning games:[/bold yellow] {drawn_games- winning_game:,}")
+    with profiler.phase("render"):
+        # Display results
+        console.rule(f"[bold green]Lotto Simulation Results ({lotto_type.capitalize()} Draw)[/bold green]")
+        table = Table(title="Division Results")
+        table.add_column("Division", justify="right")
+        table.add_column("Winning Games", justify="right")
+        table.add_column("Representation", justify="left")
+
+        # Add rows for all divisions, even if no winners
+        winning_game = 0
+        for division, req_winning, req_supp in DIVISIONS[lotto_type]:
+            game_count = results.get(division, 0)
+            winning_game += game_count
+            blue_dots = "●" * req_winning
+            red_dots = "●" * req_supp
+            table.add_row(str(division), f"{game_count:,}", f"[blue]{blue_dots}[/blue][red]{red_dots}[/red]")
+
+        console.print(table)
+
+        # Display winning combination
+        console.print(f"\n[bold yellow]Winning Numbers:[/bold yellow] {winning}")
+        if lotto_type == "thursday":
+            console.print(f"[bold yellow]Powerball Number:[/bold yellow] [red]{supplementary}[/red]")
+        else:
+            console.print(f"[bold yellow]Supplementary Numbers:[/bold yellow] [red]{supplementary}[/red]")
+        console.print(f"[bold yellow]Total winning games:[/bold yellow] {winning_game:,}")
+        console.print(f"[bold yellow]Number of games drawn:[/bold yellow] {drawn_games:,}")
+        console.print(f"[bold yellow]Total non-winning games:[/bold yellow] {drawn_games- winning_game:,}")
+        console.print(f"[bold yellow]Seed:[/bold yellow] {seed} ({workers} worker{'s' if workers > 1 else ''})")
 
 # Main block
 if __name__ == "__main__":
@@ -1,18 +1,21 @@
 import os
-import pandas as pd
+import json
+import hashlib
+import numpy as np
 from dotenv import load_dotenv
 from collections import Counter
 from itertools import combinations
-from rich.progress import Progress
-from rich.console import Console
-from rich.table import Table
 from math import comb
+from ozoutput import console, output_format, track, write_output, Table
+from ozprofile import profiler
+from ozcache import result_cache
+from ozhistory import FrequencyTable, history_sources, iter_history, parse_window
 
 
-def load_lotto_data():
+def load_lotto_data(sources=None):
     """
-    Loads lottery data based on the LOTTO environment variable.
-    Returns the DataFrame, picknumber, maxnumber, and a list of number columns.
+    Loads lottery data based on the LOTTO environment variable, from the given history files or HISTORY.
+    Returns a function streaming the merged history as record blocks of date, main and extra (oldest first), picknumber, maxnumber and the files.
     """
     # Load environment variables
     load_dotenv()
@@ -23,31 +26,26 @@ def load_lotto_data():
     if lotto_type == 'tuesday':
         picknumber = 7
         maxnumber = 47
-        filename = 'tuesday.csv'
-        cols_to_use = ['#1', '#2', '#3', '#4', '#5', '#6', '#7']
     elif lotto_type == 'thursday':
         picknumber = 7
         maxnumber = 35
-        filename = 'thursday.csv'
-        cols_to_use = ['#1', '#2', '#3', '#4', '#5', '#6', '#7']
     elif lotto_type == 'saturday':
         picknumber = 6
         maxnumber = 45
-        filename = 'saturday.csv'
-        cols_to_use = ['#1', '#2', '#3', '#4', '#5', '#6']
     else:
         raise ValueError("Invalid LOTTO type specified. Choose from 'tuesday', 'thursday', or 'saturday'.")
 
-    try:
-        data = pd.read_csv(filename, usecols=cols_to_use)
-    except FileNotFoundError:
-        console.print(f"[red]Error: File '{filename}' not found.[/red]")
-        raise
-    except Exception as e:
-        console.print(f"[red]Error loading data: {e}[/red]")
-        raise
+    sources, _, extra_count = history_sources(lotto_type, sources or os.getenv('HISTORY'))
+    for filename in sources:
+        if not os.path.exists(filename):
+            console.print(f"[red]Error: File '{filename}' not found.[/red]")
+            raise FileNotFoundError(filename)
 
-    return data, picknumber, maxnumber
+    # Each call streams the history again, one block at a time, so it is never held in memory whole
+    def load_blocks():
+        return iter_history(sources, picknumber, extra_count)
+
+    return load_blocks, picknumber, maxnumber, sources
 
 
 def find_consecutive(draw, n):
@@ -70,31 +68,26 @@ def analyze_draws(data):
     all_pairs = Counter()
     all_triplets = Counter()
 
-    with Progress() as progress:
-        task = progress.add_task("[green]Analyzing draws...", total=draw_count)
-
-        for _, row in data.iterrows():
-            draw = sorted(row.dropna().astype(int).values)
-            all_numbers.extend(draw)
-
-            has_2_consec = find_consecutive(draw, 2)
-            has_3_consec = find_consecutive(draw, 3)
+    for _, row in track(data.iterrows(), total=draw_count, description="[green]Analyzing draws..."):
+        draw = sorted(row.dropna().astype(int).values)
+        all_numbers.extend(draw)
 
-            total_draws_with_2_consec += 1 if has_2_consec >= 1 else 0
-            total_draws_with_3_consec += 1 if has_3_consec >= 1 else 0
-            total_draws_with_multiple_2_consec += 1 if has_2_consec > 1 else 0
-            total_draws_with_2_and_3_consec += 1 if has_2_consec >= 1 and has_3_consec >= 1 else 0
+        has_2_consec = find_consecutive(draw, 2)
+        has_3_consec = find_consecutive(draw, 3)
 
-            for i in range(len(draw) - 1):
-                if draw[i] + 1 == draw[i + 1]:
-                    consecutive_pairs[(draw[i], draw[i + 1])] += 1
-                if i < len(draw) - 2 and draw[i] + 2 == draw[i + 2]:
-                    consecutive_triplets[(draw[i], draw[i + 1], draw[i + 2])] += 1
+        total_draws_with_2_consec += 1 if has_2_consec >= 1 else 0
+        total_draws_with_3_consec += 1 if has_3_consec >= 1 else 0
+        total_draws_with_multiple_2_consec += 1 if has_2_consec > 1 else 0
+        total_draws_with_2_and_3_consec += 1 if has_2_consec >= 1 and has_3_consec >= 1 else 0
 
-            all_pairs.update(combinations(draw, 2))
-            all_triplets.update(combinations(draw, 3))
+        for i in range(len(draw) - 1):
+            if draw[i] + 1 == draw[i + 1]:
+                consecutive_pairs[(draw[i], draw[i + 1])] += 1
+            if i < len(draw) - 2 and draw[i] + 2 == draw[i + 2]:
+                consecutive_triplets[(draw[i], draw[i + 1], draw[i + 2])] += 1
 
-            progress.update(task, advance=1)
+        all_pairs.update(combinations(draw, 2))
+        all_triplets.update(combinations(draw, 3))
 
     return {
         "draw_count": draw_count,
@@ -110,6 +103,216 @@ def analyze_draws(data):
     }
 
 
+class StatsAccumulator:
+    """
+    Folds blocks of draws into every statistic ozstats reports, in a single pass.
+    Counts live in dense arrays indexed by number codes. The draw and position each code was last seen at
+    are kept too, so ties come out most recently drawn first, as Counter.update over the newest-first CSVs gave.
+    """
+
+    def __init__(self, picknumber, maxnumber):
+        self.picknumber = picknumber
+        self.maxnumber = maxnumber
+        base = maxnumber + 1
+        self.shapes = {
+            "number_frequency": (base,),
+            "odd_even_distribution": (picknumber + 1,),
+            "consecutive_pairs": (base, base),
+            "consecutive_triplets": (base, base, base),
+            "all_pairs": (base, base),
+            "all_triplets": (base, base, base),
+        }
+        self.counts = {name: np.zeros(int(np.prod(shape)), dtype=np.int64) for name, shape in self.shapes.items()}
+        self.last_draw = {name: np.full(int(np.prod(shape)), -1) for name, shape in self.shapes.items()}
+        self.last_seen = {name: np.full(int(np.prod(shape)), -1) for name, shape in self.shapes.items()}
+        self.seen = dict.fromkeys(self.shapes, 0)
+        self.draw_count = 0
+        self.totals = Counter()
+
+    def add(self, name, codes, draw_numbers):
+        codes = codes.ravel()
+        self.counts[name] += np.bincount(codes, minlength=len(self.counts[name]))
+        # Later occurrences overwrite earlier ones, so each code keeps the draw and position it was last seen at
+        self.last_draw[name][codes] = draw_numbers
+        self.last_seen[name][codes] = self.seen[name] + np.arange(len(codes))
+        self.seen[name] += len(codes)
+
+    def update(self, draws):
+        draws = np.asarray(draws, dtype=np.int64)
+        if not draws.size:
+            return
+        base = self.maxnumber + 1
+        # Number of each draw in the whole history, one row per draw
+        rows = np.arange(self.draw_count, self.draw_count + len(draws))[:, None]
+        self.draw_count += len(draws)
+        self.add("odd_even_distribution", np.count_nonzero(draws % 2, axis=1), rows.ravel())
+
+        draws = np.sort(draws, axis=1)
+        self.add("number_frequency", draws, rows.repeat(draws.shape[1], axis=1).ravel())
+
+        # Consecutive runs from the differences of the sorted draws
+        consecutive = np.diff(draws, axis=1) == 1
+        consecutive_3 = consecutive[:, :-1] & consecutive[:, 1:]
+        has_2_consec = consecutive.sum(axis=1)
+        has_3_consec = consecutive_3.sum(axis=1)
+        self.totals["total_draws_with_2_consec"] += int(np.count_nonzero(has_2_consec >= 1))
+        self.totals["total_draws_with_3_consec"] += int(np.count_nonzero(has_3_consec >= 1))
+        self.totals["total_draws_with_multiple_2_consec"] += int(np.count_nonzero(has_2_consec > 1))
+        self.totals["total_draws_with_2_and_3_consec"] += int(np.count_nonzero((has_2_consec >= 1) & (has_3_consec >= 1)))
+
+        runs, starts = np.nonzero(consecutive)
+        self.add("consecutive_pairs", draws[runs, starts] * base + draws[runs, starts + 1], rows[runs, 0])
+        runs, starts = np.nonzero(consecutive_3)
+        self.add("consecutive_triplets", (draws[runs, starts] * base + draws[runs, starts + 1]) * base + draws[runs, starts + 2], rows[runs, 0])
+
+        # Every pair and triplet of each draw, in itertools.combinations order
+        for name, size in (("all_pairs", 2), ("all_triplets", 3)):
+            columns = list(combinations(range(draws.shape[1]), size))
+            codes = np.zeros((len(draws), len(columns)), dtype=np.int64)
+            for digit in range(size):
+                codes = codes * base + draws[:, [column[digit] for column in columns]]
+            self.add(name, codes, rows.repeat(len(columns), axis=1).ravel())
+
+    def counter(self, name):
+        counts = self.counts[name]
+        seen = np.flatnonzero(counts)
+        # Most recently drawn first, and in the order of that draw within it
+        seen = seen[np.lexsort((self.last_seen[name][seen], -self.last_draw[name][seen]))]
+        shape = self.shapes[name]
+        if name == "odd_even_distribution":
+            keys = [(odds, self.picknumber - odds) for odds in seen.tolist()]
+        elif len(shape) == 1:
+            keys = seen.tolist()
+        else:
+            keys = map(tuple, np.stack(np.unravel_index(seen, shape), axis=1).tolist())
+        return Counter(dict(zip(keys, counts[seen].tolist())))
+
+    def save(self, filename, digest, sources):
+        arrays = {f"counts_{name}": counts for name, counts in self.counts.items()}
+        arrays.update({f"last_draw_{name}": last_draw for name, last_draw in self.last_draw.items()})
+        arrays.update({f"last_seen_{name}": last_seen for name, last_seen in self.last_seen.items()})
+        meta = {
+            "picknumber": self.picknumber,
+            "maxnumber": self.maxnumber,
+            "draw_count": self.draw_count,
+            "seen": self.seen,
+            "totals": self.totals,
+            "digest": digest,
+            "sources": list(sources),
+        }
+        temp_file = f"{filename}.{os.getpid()}.tmp.npz"
+        np.savez(temp_file, meta=np.array(json.dumps(meta)), **arrays)
+        os.replace(temp_file, filename)
+
+    @classmethod
+    def load(cls, filename):
+        with np.load(filename) as state:
+            meta = json.loads(str(state["meta"]))
+            accumulator = cls(meta["picknumber"], meta["maxnumber"])
+            for name in accumulator.shapes:
+                accumulator.counts[name] = state[f"counts_{name}"]
+                accumulator.last_draw[name] = state[f"last_draw_{name}"]
+                accumulator.last_seen[name] = state[f"last_seen_{name}"]
+        accumulator.draw_count = meta["draw_count"]
+        accumulator.seen = meta["seen"]
+        accumulator.totals = Counter(meta["totals"])
+        return accumulator, meta["digest"], meta.get("sources")
+
+    def result(self):
+        stats = {name: self.counter(name) for name in self.shapes}
+        stats.update(
+            picknumber=self.picknumber,
+            maxnumber=self.maxnumber,
+            draw_count=self.draw_count,
+            least_often_picked=find_least_often_picked(stats["number_frequency"]),
+            cold_numbers=find_cold_numbers(stats["number_frequency"], self.maxnumber),
+        )
+        for name in ("total_draws_with_2_consec", "total_draws_with_3_consec", "total_draws_with_multiple_2_consec", "total_draws_with_2_and_3_consec"):
+            stats[name] = self.totals[name]
+        return stats
+
+
+def collect_stats(draws, picknumber, maxnumber):
+    accumulator = StatsAccumulator(picknumber, maxnumber)
+    accumulator.update(draws)
+    return accumulator.result()
+
+
+# Function to hash a block of draws with their dates, row by row so that blocks can be hashed in pieces
+def history_bytes(draws, dates):
+    return np.column_stack([np.asarray(dates, dtype="datetime64[D]").astype(np.int64), np.asarray(draws, dtype=np.int64)]).tobytes()
+
+
+# Function to fold every draw after the first processed ones into the accumulator.
+# Returns the digests of the first processed draws and of all of them.
+def fold_history(accumulator, load_blocks, processed):
+    prefix, digest = hashlib.sha256(), hashlib.sha256()
+    position = 0
+    for block in load_blocks():
+        draws, dates = block["main"], block["date"]
+        head = min(len(draws), max(0, processed - position))
+        prefix.update(history_bytes(draws[:head], dates[:head]))
+        digest.update(history_bytes(draws, dates))
+        accumulator.update(draws[head:])
+        profiler.count("rows_analyzed", len(draws) - head, phase="analyze")
+        position += len(draws)
+    # A history shorter than the saved state can never match its digest
+    return prefix.hexdigest() if position >= processed else None, digest.hexdigest()
+
+
+# Function to name the state file of a list of history files, next to the first one and keyed on every path,
+# so HISTORY sets sharing a first file keep their own state
+def stats_state_file(sources):
+    key = hashlib.sha256("\n".join(os.path.abspath(source) for source in sources).encode()).hexdigest()[:12]
+    return f"{sources[0]}.{key}.stats.npz"
+
+
+def update_stats(load_blocks, picknumber, maxnumber, sources):
+    """
+    Folds only the draws appended since the saved state of these history files into it, then saves it again.
+    Falls back to a full rebuild when the state is missing, belongs to other files or any older draw changed.
+    """
+    state_file = stats_state_file(sources)
+    paths = [os.path.abspath(source) for source in sources]
+    accumulator, digest = None, None
+    if os.path.exists(state_file):
+        try:
+            accumulator, digest, state_paths = StatsAccumulator.load(state_file)
+        except (OSError, ValueError, KeyError):
+            accumulator = None
+        else:
+            accumulator = accumulator if state_paths == paths else None
+    if accumulator is None or (accumulator.picknumber, accumulator.maxnumber) != (picknumber, maxnumber):
+        accumulator, digest = StatsAccumulator(picknumber, maxnumber), None
+
+    processed = accumulator.draw_count
+    prefix_digest, history_digest = fold_history(accumulator, load_blocks, processed)
+    if processed and prefix_digest != digest:
+        # Older draws changed, count everything again
+        accumulator = StatsAccumulator(picknumber, maxnumber)
+        _, history_digest = fold_history(accumulator, load_blocks, 0)
+
+    if history_digest != digest:
+        accumulator.save(state_file, history_digest, paths)
+    return accumulator.result()
+
+
+def analyze_draw_matrix(draws):
+    """
+    Vectorized analyze_draws over a (draws, picknumber) matrix of complete draws.
+    Returns the same dictionary, with Counters in the same insertion order.
+    """
+    draws = np.asarray(draws, dtype=np.int64)
+    # analyze_draws lists ties in row order, which the accumulator gives for the rows reversed
+    stats = collect_stats(draws[::-1], draws.shape[1], int(draws.max()) if draws.size else 0)
+    stats["all_numbers"] = np.sort(draws, axis=1).ravel().tolist()
+    # Keys in the order analyze_draws returns them
+    return {name: stats[name] for name in (
+        "draw_count", "total_draws_with_2_consec", "total_draws_with_3_consec", "total_draws_with_multiple_2_consec",
+        "total_draws_with_2_and_3_consec", "all_numbers", "consecutive_pairs", "consecutive_triplets", "all_pairs", "all_triplets",
+    )}
+
+
 def calculate_frequency(all_numbers):
     return Counter(all_numbers)
 
@@ -122,46 +325,86 @@ def find_cold_numbers(number_frequency, maxnumber):
     return [num for num in range(1, maxnumber + 1) if num not in number_frequency]
 
 
-def display_analysis_results(analysis, number_frequency, maxnumber):
+def display_analysis_results(stats):
     console.rule("[bold red]Historical Analysis Results")
 
-    console.print(f"Total draws analyzed: {analysis['draw_count']}")
-    console.print(f"Draws with at least 2 consecutive numbers: [green]{analysis['total_draws_with_2_consec']}[/green] ([cyan]{analysis['total_draws_with_2_consec']/analysis['draw_count']:.2%}[/cyan])")
-    console.print(f"Draws with at least 3 consecutive numbers: [green]{analysis['total_draws_with_3_consec']}[/green] ([cyan]{analysis['total_draws_with_3_consec']/analysis['draw_count']:.2%}[/cyan])")
-    console.print(f"Draws with multiple 2 consecutive numbers: [green]{analysis['total_draws_with_multiple_2_consec']}[/green] ([cyan]{analysis['total_draws_with_multiple_2_consec']/analysis['draw_count']:.2%}[/cyan])")
-    console.print(f"Draws with 2 consecutive and 3 consecutive numbers: [green]{analysis['total_draws_with_2_and_3_consec']}[/green] ([cyan]{analysis['total_draws_with_2_and_3_consec']/analysis['draw_count']:.2%}[/cyan])")
+    console.print(f"Total draws analyzed: {stats['draw_count']}")
+    console.print(f"Draws with at least 2 consecutive numbers: [green]{stats['total_draws_with_2_consec']}[/green] ([cyan]{stats['total_draws_with_2_consec']/stats['draw_count']:.2%}[/cyan])")
+    console.print(f"Draws with at least 3 consecutive numbers: [green]{stats['total_draws_with_3_consec']}[/green] ([cyan]{stats['total_draws_with_3_consec']/stats['draw_count']:.2%}[/cyan])")
+    console.print(f"Draws with multiple 2 consecutive numbers: [green]{stats['total_draws_with_multiple_2_consec']}[/green] ([cyan]{stats['total_draws_with_multiple_2_consec']/stats['draw_count']:.2%}[/cyan])")
+    console.print(f"Draws with 2 consecutive and 3 consecutive numbers: [green]{stats['total_draws_with_2_and_3_consec']}[/green] ([cyan]{stats['total_draws_with_2_and_3_consec']/stats['draw_count']:.2%}[/cyan])")
     console.print()
 
-    least_often_picked = find_least_often_picked(number_frequency)
-    cold_numbers = find_cold_numbers(number_frequency, maxnumber)
-
-    console.print(f"Least often picked numbers: [yellow]{least_often_picked}[/yellow]")
-    console.print(f"Cold Numbers (not picked): [blue]{cold_numbers}[/blue]")
+    console.print(f"Least often picked numbers: [yellow]{stats['least_often_picked']}[/yellow]")
+    console.print(f"Cold Numbers (not picked): [blue]{stats['cold_numbers']}[/blue]")
     console.print()
 
-    # Calculate the odd/even distribution
-    odd_even_distribution = Counter()
-
-    for _, row in data.iterrows():
-        odds = sum(1 for num in row if num % 2 != 0)
-        evens = picknumber - odds
-        odd_even_distribution[(odds, evens)] += 1
-
-    # Calculate the frequency of each number
-    number_frequency = Counter()
-    for _, row in data.iterrows():
-        numbers = row.values
-        number_frequency.update(numbers)
-
     # Draw the odd/even distribution graph
-    distribution = probability_distribution(picknumber)
+    distribution = probability_distribution(stats['picknumber'])
     display_distribution_graph(distribution)
-    display_odd_even_distribution_graph(odd_even_distribution, picknumber)
-
-    display_common_pairs(analysis['all_pairs'])
-    display_common_triplets(analysis['all_triplets'])
-    display_common_consecutive_pairs(analysis['consecutive_pairs'])
-    display_common_consecutive_triplets(analysis['consecutive_triplets'])
+    display_odd_even_distribution_graph(stats['odd_even_distribution'], stats['picknumber'])
+
+    display_common_pairs(stats['all_pairs'])
+    display_common_triplets(stats['all_triplets'])
+    display_common_consecutive_pairs(stats['consecutive_pairs'])
+    display_common_consecutive_triplets(stats['consecutive_triplets'])
+
+
+# Function to find the five hottest and coldest numbers of each window, with their counts
+def window_records(table, windows, maxnumber):
+    records = []
+    for window in windows:
+        first, stop = table.positions(**parse_window(window))
+        counts = table.window(**parse_window(window))[1:maxnumber + 1]
+        # Stable sorts, so ties are listed lowest number first
+        hot = np.argsort(-counts, kind="stable")[:5]
+        cold = np.argsort(counts, kind="stable")[:5]
+        records.append({
+            "window": window,
+            "draws": stop - first,
+            "hot": (hot + 1).tolist(),
+            "hot_counts": counts[hot].tolist(),
+            "cold": (cold + 1).tolist(),
+            "cold_counts": counts[cold].tolist(),
+        })
+    return records
+
+
+def display_window_frequencies(records):
+    table_windows = Table(title="Hot and Cold Numbers by Window")
+    table_windows.add_column("Window", justify="center", style="magenta")
+    table_windows.add_column("Draws", justify="center", style="cyan")
+    table_windows.add_column("Hot Numbers", justify="center", style="red")
+    table_windows.add_column("Cold Numbers", justify="center", style="blue")
+
+    for record in records:
+        table_windows.add_row(
+            record["window"],
+            f"{record['draws']}",
+            ", ".join(f"{num} ({count})" for num, count in zip(record["hot"], record["hot_counts"])),
+            ", ".join(f"{num} ({count})" for num, count in zip(record["cold"], record["cold_counts"])),
+        )
+    console.print(table_windows)
+
+
+# Function to gather the statistics as a results document for OUTPUT, the most common combinations limited to top
+def stats_results(stats, top=5):
+    picknumber = stats["picknumber"]
+    results = {
+        name: stats[name] for name in (
+            "draw_count", "total_draws_with_2_consec", "total_draws_with_3_consec", "total_draws_with_multiple_2_consec",
+            "total_draws_with_2_and_3_consec", "cold_numbers",
+        )
+    }
+    results["least_often_picked"] = [number for number, _ in stats["least_often_picked"]]
+    results["frequency"] = [{"number": number, "count": stats["number_frequency"][number]} for number in range(1, stats["maxnumber"] + 1)]
+    results["odd_even"] = [
+        {"odd": odds, "even": picknumber - odds, "drawn": stats["odd_even_distribution"].get((odds, picknumber - odds), 0), "probability": comb(picknumber, odds) / 2 ** picknumber}
+        for odds in range(picknumber + 1)
+    ]
+    for name in ("all_pairs", "all_triplets", "consecutive_pairs", "consecutive_triplets"):
+        results[name] = [{"numbers": list(numbers), "count": count} for numbers, count in stats[name].most_common(top)]
+    return results
 
 
 def display_odd_even_distribution_graph(odd_even_counts, picknumber):
@@ -244,10 +487,41 @@ def display_common_consecutive_triplets(consecutive_triplets):
 
 
 if __name__ == "__main__":
-    # Init rich text console
-    console = Console()
-
-    data, picknumber, maxnumber = load_lotto_data()
-    analysis = analyze_draws(data)
-    number_frequency = calculate_frequency(analysis['all_numbers'])
-    display_analysis_results(analysis, number_frequency, maxnumber)
+    # OUTPUT=json or csv writes the results alone to stdout, with no tables or progress bars
+    load_dotenv()
+    output = output_format()
+
+    with profiler.phase("load"):
+        load_blocks, picknumber, maxnumber, sources = load_lotto_data()
+    # Results come from the cache while the history files are unchanged, CACHE=false always recomputes them
+    lotto_type = os.getenv("LOTTO")
+    with profiler.phase("analyze"):
+        stats = result_cache.cached(
+            "stats", lotto_type, sources, {"picknumber": picknumber, "maxnumber": maxnumber},
+            lambda: update_stats(load_blocks, picknumber, maxnumber, sources),
+        )
+    if not output:
+        with profiler.phase("render"):
+            display_analysis_results(stats)
+
+    # Hot and cold numbers over several windows, e.g. WINDOWS=10,50,200,2024-01-01:2024-12-31
+    windows = [window.strip() for window in os.getenv('WINDOWS', '').split(',') if window.strip()]
+    if windows:
+        def compute_windows():
+            frequency_table = FrequencyTable(maxnumber)
+            for block in load_blocks():
+                frequency_table.update(block["date"], block["main"])
+            return window_records(frequency_table, windows, maxnumber)
+
+        with profiler.phase("windows"):
+            window_results = result_cache.cached("windows", lotto_type, sources, {"maxnumber": maxnumber, "windows": windows}, compute_windows)
+        if not output:
+            with profiler.phase("render"):
+                display_window_frequencies(window_results)
+
+    if output:
+        with profiler.phase("render"):
+            results = {"lotto": lotto_type, **stats_results(stats)}
+            if windows:
+                results["windows"] = window_results
+            write_output(results, output)
@@ -0,0 +1,338 @@
+import struct
+import numpy as np
+from math import comb
+
+
+# Function to turn number weights (a dict or Counter keyed by number) into an array indexed by number
+def weight_array(weights, maxnumber):
+    return np.array([0] + [weights.get(num, 1) for num in range(1, maxnumber + 1)], dtype=np.float64)
+
+
+# Function to draw sampling keys: the smallest keys of a row are a sample without replacement,
+# uniform for plain random keys and successive weighted sampling for Exp(weight) keys
+def sample_keys(rng, rows, maxnumber, weights=None):
+    if weights is None:
+        return rng.random((rows, maxnumber))
+    return rng.exponential(size=(rows, maxnumber)) / weights[1:]
+
+
+# Function to pick the count numbers with the smallest keys in every row, in key order
+def smallest_keys(keys, count, numbers):
+    if count >= keys.shape[1]:
+        return numbers[np.argsort(keys, axis=1)]
+    chosen = np.argpartition(keys, count - 1, axis=1)[:, :count]
+    order = np.argsort(np.take_along_axis(keys, chosen, axis=1), axis=1)
+    return numbers[np.take_along_axis(chosen, order, axis=1)]
+
+
+# Function to encode numbers as a 64-bit mask, bit (n - 1) set for number n
+def encode_numbers(numbers):
+    mask = 0
+    for num in numbers:
+        mask |= 1 << (num - 1)
+    return np.uint64(mask)
+
+
+# Function to encode games as main number masks plus a powerball column (0 when there is none)
+def encode_games(games, picknumber):
+    if isinstance(games, np.ndarray):
+        main_numbers = games[:, :picknumber]
+        powerballs = games[:, picknumber] if games.shape[1] > picknumber else np.zeros(len(games))
+    else:
+        # Lists may be ragged, with only some games carrying a powerball
+        main_numbers = np.array([game[:picknumber] for game in games], dtype=np.int64).reshape(-1, picknumber)
+        powerballs = np.array([game[picknumber] if len(game) > picknumber else 0 for game in games])
+    bits = np.left_shift(np.uint64(1), (main_numbers - 1).astype(np.uint64))
+    masks = np.bitwise_or.reduce(bits, axis=1)
+    return masks, powerballs.astype(np.uint8)
+
+
+# Function to count set bits of every mask in an uint64 array
+def popcount(masks):
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(masks)
+    # SWAR popcount for NumPy < 2.0
+    masks = masks - ((masks >> np.uint64(1)) & np.uint64(0x5555555555555555))
+    masks = (masks & np.uint64(0x3333333333333333)) + ((masks >> np.uint64(2)) & np.uint64(0x3333333333333333))
+    masks = (masks + (masks >> np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+    return ((masks * np.uint64(0x0101010101010101)) >> np.uint64(56)).astype(np.uint8)
+
+
+# Function to build a table of binomial coefficients, binomials[n, k] = C(n, k)
+def binomial_table(maxnumber, picknumber):
+    return np.array([[comb(n, k) for k in range(picknumber + 1)] for n in range(maxnumber + 1)], dtype=np.int64)
+
+
+# Function to unrank a block of colex combination ranks into number masks
+def unrank_masks(ranks, picknumber, binomials):
+    ranks = ranks.copy()
+    masks = np.zeros(len(ranks), dtype=np.uint64)
+    for k in range(picknumber, 0, -1):
+        # The k-th smallest element is the largest c with C(c, k) <= rank
+        element = np.searchsorted(binomials[:, k], ranks, side="right") - 1
+        ranks -= binomials[element, k]
+        masks |= np.left_shift(np.uint64(1), element.astype(np.uint64))
+    return masks
+
+
+# Function to decode masks back into sorted (masks, picknumber) number arrays
+def decode_masks(masks, picknumber, maxnumber, chunk_size=1000000):
+    numbers = np.empty((len(masks), picknumber), dtype=np.int64)
+    shifts = np.arange(maxnumber, dtype=np.uint64)
+    for start in range(0, len(masks), chunk_size):
+        bits = (np.asarray(masks[start:start + chunk_size])[:, None] >> shifts) & np.uint64(1)
+        numbers[start:start + chunk_size] = np.nonzero(bits)[1].reshape(-1, picknumber) + 1
+    return numbers
+
+
+# Function to rank masks in colex order, the inverse of unrank_masks
+def rank_masks(masks, picknumber, maxnumber, binomials):
+    elements = decode_masks(masks, picknumber, maxnumber) - 1
+    return binomials[elements, np.arange(1, picknumber + 1)].sum(axis=1)
+
+
+# Ticket book files: a 16-byte header, the uint64 masks, then the uint8 powerballs if the book has them
+BOOK_MAGIC = b"OZTB"
+BOOK_HEADER = struct.Struct("<4sBBBBQ")
+BOOK_VERSION = 1
+
+
+class TicketBook:
+    """Tickets stored as 64-bit number masks, with an optional powerball column."""
+
+    def __init__(self, masks, picknumber, maxnumber, powerballs=None):
+        self.masks = masks
+        self.picknumber = picknumber
+        self.maxnumber = maxnumber
+        self.powerballs = powerballs
+
+    @classmethod
+    def from_tickets(cls, tickets, picknumber, maxnumber):
+        masks, powerballs = encode_games(tickets, picknumber)
+        return cls(masks, picknumber, maxnumber, powerballs if powerballs.any() else None)
+
+    @classmethod
+    def from_ranks(cls, ranks, picknumber, maxnumber, powerballs=None):
+        return cls(unrank_masks(np.asarray(ranks, dtype=np.int64), picknumber, binomial_table(maxnumber, picknumber)), picknumber, maxnumber, powerballs)
+
+    @classmethod
+    def load(cls, filename, mmap=True):
+        with open(filename, "rb") as file:
+            magic, version, picknumber, maxnumber, has_powerball, count = BOOK_HEADER.unpack(file.read(BOOK_HEADER.size))
+        if magic != BOOK_MAGIC or version != BOOK_VERSION:
+            raise ValueError(f"{filename} is not a ticket book file.")
+        if mmap and count:
+            masks = np.memmap(filename, dtype=np.uint64, mode="r", offset=BOOK_HEADER.size, shape=(count,))
+            powerballs = np.memmap(filename, dtype=np.uint8, mode="r", offset=BOOK_HEADER.size + 8 * count, shape=(count,)) if has_powerball else None
+        else:
+            with open(filename, "rb") as file:
+                file.seek(BOOK_HEADER.size)
+                masks = np.fromfile(file, dtype=np.uint64, count=count)
+                powerballs = np.fromfile(file, dtype=np.uint8, count=count) if has_powerball else None
+        return cls(masks, picknumber, maxnumber, powerballs)
+
+    @staticmethod
+    def is_book_file(filename):
+        with open(filename, "rb") as file:
+            return file.read(len(BOOK_MAGIC)) == BOOK_MAGIC
+
+    def save(self, filename):
+        with open(filename, "wb") as file:
+            file.write(BOOK_HEADER.pack(BOOK_MAGIC, BOOK_VERSION, self.picknumber, self.maxnumber, self.powerballs is not None, len(self)))
+            np.ascontiguousarray(self.masks, dtype=np.uint64).tofile(file)
+            if self.powerballs is not None:
+                np.ascontiguousarray(self.powerballs, dtype=np.uint8).tofile(file)
+
+    def __len__(self):
+        return len(self.masks)
+
+    def __getitem__(self, index):
+        if isinstance(index, (int, np.integer)):
+            # Normalised through a range, so negative indices count from the end and out-of-range ones raise IndexError
+            index = range(len(self))[index]
+            return self.to_array(self.masks[index:index + 1], None if self.powerballs is None else self.powerballs[index:index + 1])[0].tolist()
+        return TicketBook(self.masks[index], self.picknumber, self.maxnumber, None if self.powerballs is None else self.powerballs[index])
+
+    def __iter__(self):
+        # Decode in chunks, so iterating a memory-mapped book never materialises all of it
+        for start in range(0, len(self), 100000):
+            yield from self[start:start + 100000].tolist()
+
+    def to_array(self, masks=None, powerballs=None):
+        if masks is None:
+            masks, powerballs = self.masks, self.powerballs
+        tickets = decode_masks(np.asarray(masks), self.picknumber, self.maxnumber)
+        if powerballs is not None:
+            tickets = np.column_stack([tickets, np.asarray(powerballs, dtype=np.int64)])
+        return tickets
+
+    def tolist(self):
+        return self.to_array().tolist()
+
+    def ranks(self):
+        return rank_masks(np.asarray(self.masks), self.picknumber, self.maxnumber, binomial_table(self.maxnumber, self.picknumber))
+
+    def unique(self):
+        # Keep the first copy of every ticket, in book order
+        keys = np.asarray(self.masks) if self.powerballs is None else np.asarray(self.masks) * np.uint64(256) + self.powerballs
+        _, first = np.unique(keys, return_index=True)
+        return self[np.sort(first)]
+
+
+# Function to sample count of the given numbers without replacement in every row, with Floyd's algorithm
+def floyd_sample(rng, rows, count, numbers):
+    chosen = np.empty((rows, count), dtype=np.int64)
+    for i, j in enumerate(range(len(numbers) - count, len(numbers))):
+        candidate = rng.integers(0, j + 1, rows)
+        repeated = (chosen[:, :i] == candidate[:, None]).any(axis=1)
+        chosen[:, i] = np.where(repeated, j, candidate)
+    return numbers[chosen]
+
+
+# Function to generate a batch of sorted tickets as an (count, picknumber) array
+def generate_tickets(count, picknumber, maxnumber, rng=None, distributions=None, probabilities=None, weights=None, chunk_size=100000):
+    rng = rng if rng is not None else np.random.default_rng()
+    numbers = np.arange(1, maxnumber + 1)
+    odd_numbers, even_numbers = numbers[::2], numbers[1::2]
+    tickets = np.empty((count, picknumber), dtype=np.int64)
+
+    # Work in chunks so the per-chunk arrays stay small
+    for start in range(0, count, chunk_size):
+        rows = min(chunk_size, count - start)
+
+        if distributions is None and weights is None:
+            chunk = floyd_sample(rng, rows, picknumber, numbers)
+        elif distributions is None:
+            chunk = smallest_keys(sample_keys(rng, rows, maxnumber, weights), picknumber, numbers)
+        else:
+            # Pick an odd/even split per ticket, then fill it from the odd and even numbers
+            split = rng.choice(len(distributions), size=rows, p=probabilities)
+            odd_counts = np.array([odd_count for odd_count, _ in distributions])[split]
+            if weights is None:
+                chunk = np.empty((rows, picknumber), dtype=np.int64)
+                for index, (odd_count, even_count) in enumerate(distributions):
+                    group = split == index
+                    chunk[group] = np.concatenate([
+                        floyd_sample(rng, np.count_nonzero(group), odd_count, odd_numbers),
+                        floyd_sample(rng, np.count_nonzero(group), even_count, even_numbers),
+                    ], axis=1)
+            else:
+                keys = sample_keys(rng, rows, maxnumber, weights)
+                ranked = np.concatenate([
+                    smallest_keys(keys[:, ::2], len(odd_numbers), odd_numbers),
+                    smallest_keys(keys[:, 1::2], len(even_numbers), even_numbers),
+                ], axis=1)
+                selected = np.concatenate([
+                    np.arange(len(odd_numbers)) < odd_counts[:, None],
+                    np.arange(len(even_numbers)) < (picknumber - odd_counts)[:, None],
+                ], axis=1)
+                chunk = ranked[selected].reshape(rows, picknumber)
+
+        chunk.sort(axis=1)
+        tickets[start:start + rows] = chunk
+    return tickets
+
+
+# Function to generate one powerball per ticket, optionally never repeating one of the ticket's numbers
+def generate_powerballs(count, maxnumberp, rng=None, weights=None, tickets=None):
+    rng = rng if rng is not None else np.random.default_rng()
+    if weights is None and tickets is None:
+        return rng.integers(1, maxnumberp + 1, count)
+    keys = sample_keys(rng, count, maxnumberp, weights)
+    if tickets is not None:
+        taken = np.zeros((count, max(maxnumberp, int(tickets.max())) + 1), dtype=bool)
+        np.put_along_axis(taken, tickets, True, axis=1)
+        keys[taken[:, 1:maxnumberp + 1]] = np.inf
+    return keys.argmin(axis=1) + 1
+
+
+class ConstrainedSampler:
+    """
+    Samples tickets from exactly the tickets that meet the constraints, without rejection.
+    counts[n, k, o, s, r] is the total weight of picking k numbers, o of them odd, summing to s, from 1..n,
+    when the numbers just above n end in a run of r picked numbers. A ticket's weight is the product of its number weights.
+    """
+
+    def __init__(self, picknumber, maxnumber, weights=None, max_run=None, sum_range=None, exclude=(), require=()):
+        self.picknumber, self.maxnumber = picknumber, maxnumber
+        # Sums and runs only get a table dimension when they are constrained
+        self.max_run = max_run if max_run is not None and max_run < picknumber else None
+        self.sum_range = sum_range
+        self.runs = self.max_run + 1 if self.max_run is not None else 1
+        self.sums = sum_range[1] + 1 if sum_range is not None else 1
+
+        self.weights = np.ones(maxnumber + 1) if weights is None else np.array(weights, dtype=np.float64)
+        self.weights[0] = 0
+        self.weights[list(exclude)] = 0
+        # Scaled to a mean of 1, so products of many weights stay well within float range
+        if self.weights.any():
+            self.weights /= self.weights[self.weights > 0].mean()
+        self.required = np.zeros(maxnumber + 1, dtype=bool)
+        self.required[list(require)] = True
+
+        self.counts = np.zeros((maxnumber + 1, picknumber + 1, picknumber + 1, self.sums, self.runs))
+        self.counts[0, 0, 0, 0, :] = 1
+        for n in range(1, maxnumber + 1):
+            previous, current = self.counts[n - 1], self.counts[n]
+            if not self.required[n]:
+                current += previous[:, :, :, :1]
+            if self.weights[n] and (self.sum_range is None or n < self.sums):
+                odd, shift = n % 2, n if self.sum_range is not None else 0
+                # Picking n continues the run above it, so it needs room for one more
+                runs = slice(1, None) if self.max_run is not None else slice(None)
+                current[1:, odd:, shift:, :self.runs - (self.max_run is not None)] += (
+                    self.weights[n] * previous[:-1, :previous.shape[1] - odd, :self.sums - shift, runs]
+                )
+
+    # Function to total the weight of all valid tickets with each odd count, over the allowed sums
+    def split_weights(self):
+        top = self.counts[self.maxnumber, self.picknumber, :, :, 0]
+        if self.sum_range is not None:
+            return top[:, self.sum_range[0]:].sum(axis=1)
+        return top[:, 0]
+
+    def sample(self, count, rng=None, odd_counts=None):
+        rng = rng if rng is not None else np.random.default_rng()
+        split = self.split_weights()
+        if not split.sum():
+            raise ValueError("No ticket meets the constraints.")
+        if odd_counts is None:
+            odd_counts = rng.choice(len(split), size=count, p=split / split.sum())
+        odd_counts = np.asarray(odd_counts, dtype=np.int64)
+        if not split[odd_counts].all():
+            raise ValueError("No ticket meets the constraints with the requested odd/even split.")
+
+        # Pick each ticket's sum in proportion to its weight, then walk down the numbers once
+        sums = np.zeros(count, dtype=np.int64)
+        if self.sum_range is not None:
+            low = self.sum_range[0]
+            for odd_count in np.unique(odd_counts):
+                group = odd_counts == odd_count
+                cumulative = np.cumsum(self.counts[self.maxnumber, self.picknumber, odd_count, low:, 0])
+                targets = rng.random(np.count_nonzero(group)) * cumulative[-1]
+                sums[group] = low + np.minimum(np.searchsorted(cumulative, targets, side="right"), len(cumulative) - 1)
+
+        left, odds, runs = np.full(count, self.picknumber), odd_counts.copy(), np.zeros(count, dtype=np.int64)
+        tickets, filled = np.zeros((count, self.picknumber), dtype=np.int64), np.zeros(count, dtype=np.int64)
+        draws = rng.random((self.maxnumber, count))
+        for n in range(self.maxnumber, 0, -1):
+            odd, shift = n % 2, n if self.sum_range is not None else 0
+            total = self.counts[n, left, odds, sums, runs]
+            possible = (left > 0) & (odds >= odd) & (sums >= shift)
+            next_runs = runs
+            if self.max_run is not None:
+                possible &= runs < self.max_run
+                next_runs = np.minimum(runs + 1, self.max_run)
+            take = np.where(
+                possible,
+                self.weights[n] * self.counts[n - 1, np.maximum(left - 1, 0), np.maximum(odds - odd, 0), np.maximum(sums - shift, 0), next_runs],
+                0,
+            )
+            picked = possible & (draws[n - 1] * total < take)
+            tickets[picked, filled[picked]] = n
+            filled += picked
+            left -= picked
+            odds -= picked * odd
+            sums -= picked * shift
+            runs = np.where(picked, runs + 1, 0) if self.max_run is not None else runs
+        return np.sort(tickets, axis=1)
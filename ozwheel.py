@@ -0,0 +1,123 @@
+import os
+import heapq
+import numpy as np
+from math import comb
+from itertools import combinations
+from dotenv import load_dotenv
+from rich.console import Console
+from rich.table import Table
+from oztickets import binomial_table, decode_masks, unrank_masks, TicketBook
+
+# Initialize rich console
+console = Console()
+
+
+# Function to draw the candidate tickets from a pool: every combination when there are few enough, else a random sample of them
+def wheel_candidates(pool_size, picknumber, candidate_count, rng):
+    total = comb(pool_size, picknumber)
+    ranks = np.arange(total, dtype=np.int64) if total <= candidate_count else np.sort(rng.choice(total, candidate_count, replace=False))
+    masks = unrank_masks(ranks, picknumber, binomial_table(pool_size, picknumber))
+    # Positions within the pool, not numbers, so they index straight into the subset ranks
+    return decode_masks(masks, picknumber, pool_size) - 1
+
+
+# Function to list the colex ranks of every cover-sized subset of each candidate ticket
+def subset_ranks(candidates, cover, pool_size):
+    binomials = binomial_table(pool_size, cover)
+    columns = np.array(list(combinations(range(candidates.shape[1]), cover)))
+    subsets = candidates[:, columns]
+    return binomials[subsets, np.arange(1, cover + 1)].sum(axis=2).astype(np.int32)
+
+
+# Function to pick tickets greedily, each covering the most subsets not covered yet.
+# Gains only ever go down, so a popped candidate whose refreshed gain still beats the next one in the queue is the best.
+def greedy_wheel(subsets, subset_count, ticket_count):
+    covered = np.zeros(subset_count, dtype=bool)
+    queue = [(-subsets.shape[1], index) for index in range(len(subsets))]
+    heapq.heapify(queue)
+    chosen, evaluations = [], 0
+
+    while queue and len(chosen) < ticket_count:
+        _, index = heapq.heappop(queue)
+        gain = int(np.count_nonzero(~covered[subsets[index]]))
+        evaluations += 1
+        if queue and gain < -queue[0][0]:
+            heapq.heappush(queue, (-gain, index))
+            continue
+        if not gain:
+            # Every subset the candidates can reach is covered
+            break
+        covered[subsets[index]] = True
+        chosen.append(index)
+    return chosen, covered, evaluations
+
+
+# Function to display the wheel and the coverage it achieved
+def display_wheel(tickets, pool, cover, covered, candidate_count, evaluations):
+    table = Table(title="Wheel Tickets")
+    table.add_column("Ticket", justify="center", style="magenta")
+    table.add_column("Numbers", justify="center", style="cyan")
+    for index, ticket in enumerate(tickets.tolist(), start=1):
+        table.add_row(f"{index}", f"{ticket}")
+    console.print(table)
+
+    console.print(f"[bold yellow]Pool:[/bold yellow] {pool.tolist()}")
+    console.print(f"[bold yellow]Tickets:[/bold yellow] {len(tickets):,} from {candidate_count:,} candidates ({evaluations:,} gain evaluations)")
+    console.print(
+        f"[bold yellow]{cover}-number combinations covered:[/bold yellow] "
+        f"{np.count_nonzero(covered):,} of {len(covered):,} ([green]{np.count_nonzero(covered) / len(covered):.2%}[/green])"
+    )
+
+
+# Function to save the wheel, as a ticket book for .oztb names and comma-separated lines otherwise
+def save_wheel(tickets, picknumber, maxnumber, filename):
+    if filename.endswith(".oztb"):
+        TicketBook.from_tickets(tickets, picknumber, maxnumber).save(filename)
+        return
+    with open(filename, "w") as file:
+        for ticket in tickets.tolist():
+            file.write(",".join(map(str, ticket)) + "\n")
+
+
+def wheel_lotto():
+    load_dotenv()
+    lotto_type = os.getenv("LOTTO", "tuesday").lower()
+    ticket_count = int(os.getenv("SUGGEST", 50))
+    cover = int(os.getenv("COVER", 3))
+    candidate_count = int(os.getenv("CANDIDATES", 200000))
+    seed = int(os.getenv("SEED") or np.random.SeedSequence().entropy)
+    save = os.getenv("SAVE")
+
+    # Lotto-specific settings
+    if lotto_type == "tuesday":
+        picknumber, maxnumber = 7, 47
+    elif lotto_type == "thursday":
+        picknumber, maxnumber = 7, 35
+    elif lotto_type == "saturday":
+        picknumber, maxnumber = 6, 45
+    else:
+        console.print("[red]Invalid LOTTO type specified.[/red]")
+        return
+
+    pool = np.array(sorted({int(num) for num in os.getenv("POOL", "").split(",") if num.strip()}) or range(1, maxnumber + 1))
+    if pool.min() < 1 or pool.max() > maxnumber or len(pool) < picknumber:
+        console.print(f"[red]POOL needs at least {picknumber} numbers between 1 and {maxnumber}.[/red]")
+        return
+    if not 1 <= cover <= picknumber:
+        console.print(f"[red]COVER must be between 1 and {picknumber}.[/red]")
+        return
+
+    candidates = wheel_candidates(len(pool), picknumber, candidate_count, np.random.default_rng(seed))
+    subsets = subset_ranks(candidates, cover, len(pool))
+    chosen, covered, evaluations = greedy_wheel(subsets, comb(len(pool), cover), ticket_count)
+    tickets = pool[candidates[chosen]]
+
+    display_wheel(tickets, pool, cover, covered, len(candidates), evaluations)
+    console.print(f"[bold yellow]Seed:[/bold yellow] {seed}")
+    if save:
+        save_wheel(tickets, picknumber, maxnumber, save)
+
+
+# Main block
+if __name__ == "__main__":
+    wheel_lotto()